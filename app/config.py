@@ -10,10 +10,106 @@ class Settings(BaseSettings):
     google_ads_refresh_token: str | None = None
     google_ads_customer_id: str | None = None
     google_ads_login_customer_id: str | None = None
+    # Shape responses from raw protobuf messages instead of proto-plus wrappers
+    google_ads_raw_proto_responses: bool = True
+    # Import the SDK and create the client and service channels at startup
+    google_ads_warm_up_on_startup: bool = True
     
     # API Configuration
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    # Token required in X-Admin-Token by the /admin endpoints; unset disables them
+    admin_token: str | None = None
+    
+    # Sampling profiler
+    profiler_max_seconds: int = 60
+    profiler_default_interval_ms: int = 10
+    profiler_min_interval_ms: int = 1
+    
+    # Admission control in front of Google Ads API calls
+    admission_enabled: bool = True
+    admission_max_concurrency: int = 16
+    admission_per_customer_concurrency: int = 4
+    admission_max_queue: int = 200
+    admission_max_queue_per_customer: int = 50
+    admission_queue_timeout_seconds: float = 30
+    admission_interactive_weight: float = 4
+    admission_batch_weight: float = 1
+    
+    # Circuit breakers around Google Ads API RPCs
+    circuit_breaker_enabled: bool = True
+    circuit_breaker_failure_threshold: int = 5  # Consecutive failures before opening
+    circuit_breaker_reset_timeout_seconds: int = 30  # Cool-down before a half-open trial call
+    circuit_breaker_half_open_max_calls: int = 1
+    
+    # Cache backend: "memory" (per process) or "sqlite" (shared by all workers on a host)
+    cache_backend: str = "memory"
+    cache_sqlite_path: str = "/tmp/reach-plan-service-cache.sqlite3"
+    
+    # Hedged requests for idempotent reads (ListPlannableProducts, Search)
+    hedging_enabled: bool = False
+    hedging_percentile: float = 95  # Hedge when a call is slower than this latency percentile
+    hedging_min_delay_ms: int = 50
+    hedging_default_delay_ms: int = 1000  # Used until enough latencies are recorded
+    hedging_min_samples: int = 20
+    hedging_window_size: int = 500
+    hedging_budget_ratio: float = 0.05  # Hedges allowed per primary call, across all hedged RPCs
+    hedging_max_workers: int = 16
+    
+    # Per-caller usage accounting
+    usage_tracking_enabled: bool = True
+    usage_db_path: str = "/tmp/reach-plan-service-usage.sqlite3"
+    usage_flush_interval_seconds: int = 60
+    usage_retention_days: int = 30
+    usage_daily_budget_per_caller: int = 0  # Upstream calls per caller and UTC day; 0 means unlimited
+    
+    # Request validation
+    forecast_max_duration_days: int = 365
+    
+    # Reach forecast curve cache
+    forecast_cache_enabled: bool = True
+    forecast_cache_ttl_seconds: int = 3600
+    forecast_cache_max_entries: int = 1024
+    
+    # Multi-market forecast aggregation
+    aggregate_max_markets: int = 50
+    aggregate_max_parallel_calls: int = 4
+    
+    # Product mix budget optimizer
+    optimizer_max_products: int = 10
+    optimizer_steps: int = 100
+    
+    # Plannable locations catalog
+    locations_refresh_enabled: bool = True
+    locations_refresh_interval_seconds: int = 86400
+    locations_search_max_results: int = 100
+    
+    # Plannable products cache
+    products_cache_ttl_seconds: int = 21600
+    products_cache_max_entries: int = 256
+    
+    # Customer clients cache
+    customers_cache_ttl_seconds: int = 900
+    customers_cache_max_entries: int = 256
+    
+    # Stale-while-revalidate serving of forecasts and plannable products
+    stale_while_revalidate_enabled: bool = False
+    stale_fresh_seconds: int = 300
+    stale_revalidate_seconds: int = 3600  # Max age served while refreshing in the background
+    stale_max_age_seconds: int = 86400  # Max age served when the upstream call fails
+    stale_max_entries: int = 2048
+    stale_refresh_max_workers: int = 4  # Concurrent background refreshes per store
+    
+    # Pre-warming of popular forecasts and plannable products
+    prewarm_enabled: bool = False
+    prewarm_interval_seconds: int = 900
+    prewarm_offpeak_hours: str = "0-6"  # Local hours "start-end"; empty means always
+    prewarm_quota_per_cycle: int = 20  # Upstream calls allowed per cycle
+    prewarm_top_forecasts: int = 20
+    prewarm_top_locations: int = 5
+    prewarm_history_size: int = 5000
+    prewarm_history_window_seconds: int = 604800
+    prewarm_cache_ttl_seconds: int = 86400  # How long pre-warmed results stay fresh; must reach past the peak
     
     # Environment
     environment: str = "development"
@@ -1,21 +1,95 @@
-from fastapi import FastAPI
-from app.routers import plannable_products, customers, reach_forecast
+import time
+
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
+import logging
+from app import metrics
+from app.config import settings
+from app.middleware import CallerContextMiddleware
+from app.routers import admin, plannable_locations, plannable_products, customers, reach_forecast
+from app.routers.dependencies import enforce_usage_budget
+from app.services.admission import admission_controller
+from app.services.google_ads_client import google_ads_service
+from app.services.location_index import location_catalog
+from app.services.prewarm import prewarm_scheduler
+from app.services.profiler import section_timers
+from app.services.usage import usage_tracker
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.google_ads_warm_up_on_startup:
+        try:
+            google_ads_service.warm_up()
+        except Exception as e:
+            # The client is initialized lazily on the first request instead
+            logger.error(f"Google Ads client warm-up failed: {str(e)}")
+    if settings.prewarm_enabled:
+        prewarm_scheduler.start()
+    if settings.locations_refresh_enabled:
+        location_catalog.start()
+    usage_tracker.start()
+    yield
+    prewarm_scheduler.stop()
+    location_catalog.stop()
+    usage_tracker.stop()
+
 
 app = FastAPI(
     title="Google Ads Reach Plan Service",
     description="A microservice for retrieving YouTube Reach Curve data via Google Ads API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+app.add_middleware(CallerContextMiddleware)
+
 # Include routers
-app.include_router(plannable_products.router, prefix="/api/v1", tags=["plannable-products"])
-app.include_router(customers.router, prefix="/api/v1", tags=["customers"])
-app.include_router(reach_forecast.router, prefix="/api/v1", tags=["reach-forecast"])
+# Routers that call the Google Ads API are subject to the per-caller usage budget
+usage_budget = [Depends(enforce_usage_budget)]
+app.include_router(plannable_locations.router, prefix="/api/v1", tags=["plannable-locations"])
+app.include_router(plannable_products.router, prefix="/api/v1", tags=["plannable-products"], dependencies=usage_budget)
+app.include_router(customers.router, prefix="/api/v1", tags=["customers"], dependencies=usage_budget)
+app.include_router(reach_forecast.router, prefix="/api/v1", tags=["reach-forecast"], dependencies=usage_budget)
+app.include_router(admin.router)
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/circuit-breakers")
+async def circuit_breaker_status():
+    return {"circuit_breakers": google_ads_service.circuit_breaker_states()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    for breaker in google_ads_service.circuit_breaker_states():
+        metrics.set_gauge(
+            "circuit_breaker_open",
+            1 if breaker["state"] == "open" else 0,
+            "Whether the circuit breaker for an upstream RPC is open",
+            rpc=breaker["name"],
+        )
+    for hedger in google_ads_service.hedging_stats():
+        for stat in ("calls", "hedges_issued", "hedges_won"):
+            metrics.set_gauge(f"hedging_{stat}", hedger[stat], rpc=hedger["name"])
+    admission = admission_controller.snapshot()
+    metrics.set_gauge("admission_active_requests", admission["active"], "Requests holding an admission slot")
+    metrics.set_gauge("admission_queued_requests", admission["queued"], "Requests waiting for an admission slot")
+    section_timers.export_metrics()
+    return metrics.render_prometheus()
+
+metrics.set_gauge(
+    "app_import_seconds",
+    time.perf_counter() - _import_started,
+    "Time spent importing the application module",
+)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,37 @@
+import threading
+
+_gauges: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+_help: dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def set_gauge(name: str, value: float, help_text: str = "", **labels: str) -> None:
+    """Set a gauge value, optionally qualified by labels."""
+    with _lock:
+        _gauges[(name, tuple(sorted(labels.items())))] = value
+        if help_text:
+            _help[name] = help_text
+
+
+def get_gauge(name: str, **labels: str) -> float | None:
+    with _lock:
+        return _gauges.get((name, tuple(sorted(labels.items()))))
+
+
+def render_prometheus() -> str:
+    """Render all gauges in the Prometheus text exposition format."""
+    with _lock:
+        items = sorted(_gauges.items())
+        help_texts = dict(_help)
+
+    lines = []
+    seen = set()
+    for (name, labels), value in items:
+        if name not in seen:
+            seen.add(name)
+            if name in help_texts:
+                lines.append(f"# HELP {name} {help_texts[name]}")
+            lines.append(f"# TYPE {name} gauge")
+        label_text = ",".join(f'{key}="{val}"' for key, val in labels)
+        lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,35 @@
+from app.services.usage import ANONYMOUS_CALLER, current_caller
+
+CALLER_HEADER = b"x-caller-id"
+MAX_CALLER_LENGTH = 64
+
+
+class CallerContextMiddleware:
+    """
+    Record the caller of each request from the X-Caller-Id header.
+
+    The caller is stored in the ``current_caller`` context variable for the
+    duration of the request, so usage accounting can attribute upstream calls
+    made anywhere below the routers. Requests without the header are
+    attributed to ``anonymous``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        caller = ANONYMOUS_CALLER
+        for name, value in scope["headers"]:
+            if name == CALLER_HEADER:
+                caller = value.decode("latin-1").strip()[:MAX_CALLER_LENGTH] or ANONYMOUS_CALLER
+                break
+
+        token = current_caller.set(caller)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_caller.reset(token)
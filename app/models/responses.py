@@ -12,6 +12,19 @@ class PlannableProductsResponse(BaseModel):
     total_count: int
 
 
+class PlannableLocation(BaseModel):
+    id: str
+    name: str
+    parent_country_id: str | None = None
+    country_code: str
+    location_type: str
+
+
+class PlannableLocationsResponse(BaseModel):
+    locations: list[PlannableLocation]
+    total_count: int
+
+
 class Customer(BaseModel):
     id: str
     name: str
@@ -23,6 +36,11 @@ class CustomersResponse(BaseModel):
     total_count: int
 
 
+class PlannedProduct(BaseModel):
+    plannable_product_code: str
+    budget_micros: int
+
+
 class ReachForecastRequest(BaseModel):
     start_date: str
     end_date: str
@@ -31,11 +49,7 @@ class ReachForecastRequest(BaseModel):
     plannable_location_id: str
     network: str
     currency_code: str
-
-
-class PlannedProduct(BaseModel):
-    plannable_product_code: str
-    budget_micros: int
+    planned_products: list[PlannedProduct] | None = None
 
 
 class ReachCurvePoint(BaseModel):
@@ -57,6 +71,64 @@ class ReachForecastResponse(BaseModel):
     request_parameters: ReachForecastRequest
 
 
+class ForecastAggregationRequest(BaseModel):
+    start_date: str
+    end_date: str
+    customer_id: str
+    user_list_id: str
+    plannable_location_ids: list[str]
+    networks: list[str]
+    currency_code: str
+    include_market_curves: bool = True
+    planned_products: list[PlannedProduct] | None = None
+
+
+class LocationForecast(BaseModel):
+    network: str
+    plannable_location_ids: list[str]
+    forecast: ReachForecast | None = None
+    error: str | None = None
+
+
+class NetworkForecastAggregate(BaseModel):
+    network: str
+    plannable_location_ids: list[str]
+    missing_location_ids: list[str]
+    reach_curve: list[ReachCurvePoint]
+
+
+class ForecastAggregationResponse(BaseModel):
+    forecasts: list[LocationForecast]
+    aggregates: list[NetworkForecastAggregate]
+    forecast_calls: int
+    request_parameters: ForecastAggregationRequest
+
+
+class BudgetOptimizationRequest(BaseModel):
+    start_date: str
+    end_date: str
+    customer_id: str
+    user_list_id: str
+    plannable_location_id: str
+    network: str
+    currency_code: str
+    budget_micros: int
+    product_codes: list[str] | None = None
+    validate_allocation: bool = True
+
+
+class BudgetOptimizationResponse(BaseModel):
+    allocation: list[PlannedProduct]
+    estimated_reach: int
+    even_split_estimated_reach: int
+    expected_reach: int | None = None
+    validated_forecast: ReachForecast | None = None
+    validation_error: str | None = None
+    unavailable_products: list[str]
+    forecast_calls: int
+    request_parameters: BudgetOptimizationRequest
+
+
 class ErrorResponse(BaseModel):
     error: str
     message: str
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+import logging
+
+from app.config import settings
+from app.routers.dependencies import require_admin
+from app.services.normalization import InvalidRequestError, parse_date
+from app.services.profiler import ProfilerBusy, profiler, section_timers
+from app.services.usage import usage_day, usage_tracker
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10, description="How long to sample", gt=0),
+    interval_ms: float = Query(
+        settings.profiler_default_interval_ms, description="Sampling interval in milliseconds", gt=0
+    )
+):
+    """
+    Sample the stacks of every thread in this worker for a number of seconds.
+    
+    Returns the profile in collapsed-stack format (one ``thread;frame;...;frame count``
+    line per stack), ready for flamegraph.pl or speedscope. Only the worker that
+    receives the request is profiled, and one profile runs at a time.
+    """
+    if seconds > settings.profiler_max_seconds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"seconds must not exceed {settings.profiler_max_seconds}"
+        )
+    if interval_ms < settings.profiler_min_interval_ms:
+        raise HTTPException(
+            status_code=400,
+            detail=f"interval_ms must be at least {settings.profiler_min_interval_ms}"
+        )
+    
+    logger.info(f"Profiling for {seconds} seconds at {interval_ms} ms intervals")
+    try:
+        return await run_in_threadpool(profiler.profile, seconds, interval_ms / 1000)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/hot-sections")
+async def hot_sections():
+    """Return call counts and cumulative wall time of the instrumented hot sections."""
+    return {"sections": section_timers.snapshot()}
+
+
+@router.get("/usage")
+async def usage(
+    day: str | None = Query(None, description="UTC day in YYYY-MM-DD format, defaults to today"),
+    caller: str | None = Query(None, description="Only return usage of this X-Caller-Id"),
+    customer_id: str | None = Query(None, description="Only return usage for this customer ID")
+):
+    """
+    Return Google Ads API usage per caller and customer ID for a day.
+    
+    Counts upstream calls, failed calls, timeout retries, cache hits and the time
+    spent waiting for the API, most upstream calls first. Totals include the
+    unflushed counts of this worker and the flushed counts of every worker.
+    """
+    try:
+        day = parse_date(day).isoformat() if day else usage_day()
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    entries = await run_in_threadpool(usage_tracker.usage, day, caller, customer_id)
+    return {
+        "day": day,
+        "daily_budget_per_caller": usage_tracker.daily_budget_per_caller or None,
+        "usage": entries
+    }
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path
+from starlette.concurrency import run_in_threadpool
+from app.routers.dependencies import request_priority
+from app.services.admission import AdmissionRejected, Priority, admission_controller
+from app.services.circuit_breaker import CircuitOpenError
 from app.services.google_ads_client import google_ads_service
+from app.services.normalization import InvalidRequestError, normalize_customer_id
 from app.models.responses import CustomersResponse, Customer, ErrorResponse
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
@@ -10,10 +16,13 @@ router = APIRouter(prefix="/customers", tags=["customers"])
 
 @router.get("/{customer_id}", response_model=CustomersResponse, responses={
     400: {"model": ErrorResponse},
-    500: {"model": ErrorResponse}
+    429: {"model": ErrorResponse},
+    500: {"model": ErrorResponse},
+    503: {"model": ErrorResponse}
 })
 async def get_customers(
-    customer_id: str = Path(..., description="The customer ID to search for customer clients")
+    customer_id: str = Path(..., description="The customer ID to search for customer clients"),
+    priority: Priority = Depends(request_priority)
 ):
     """
     Get customer clients for a specific customer ID using Google Ads API Search.
@@ -33,15 +42,14 @@ async def get_customers(
     try:
         logger.info(f"Searching customers for customer ID: {customer_id}")
         
-        # Validate customer_id format (should be numeric)
-        if not customer_id.isdigit():
-            raise HTTPException(
-                status_code=400,
-                detail="Customer ID must be numeric"
-            )
+        # Validate customer_id format (numeric, dashes allowed)
+        customer_id = normalize_customer_id(customer_id)
         
-        # Call the Google Ads service
-        customers_data = google_ads_service.search_customers(customer_id)
+        # Cached results are served without waiting for a Google Ads API slot
+        customers_data = await run_in_threadpool(google_ads_service.cached_customers, customer_id)
+        if customers_data is None:
+            async with admission_controller.admit(customer_id, priority):
+                customers_data = await run_in_threadpool(google_ads_service.search_customers, customer_id)
         
         # Convert to response models
         customers = [Customer(id=customer["id"], name=customer["name"]) for customer in customers_data]
@@ -58,6 +66,25 @@ async def get_customers(
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except InvalidRequestError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except CircuitOpenError as e:
+        logger.warning(f"Rejected request while circuit is open: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected request by admission control: {str(e)}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
     except Exception as e:
         logger.error(f"Error fetching customers: {str(e)}")
         raise HTTPException(
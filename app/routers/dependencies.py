@@ -0,0 +1,47 @@
+from fastapi import Header, HTTPException
+import hmac
+import math
+
+from app.config import settings
+from app.services.admission import Priority
+from app.services.usage import UsageBudgetExceeded, current_caller, usage_tracker
+
+
+def request_priority(
+    x_request_priority: str | None = Header(
+        None,
+        description="Request priority class: interactive (default) or batch"
+    )
+) -> Priority:
+    """Read the admission priority class of a request from the X-Request-Priority header."""
+    if not x_request_priority:
+        return Priority.INTERACTIVE
+    try:
+        return Priority(x_request_priority.strip().lower())
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"X-Request-Priority must be one of: {', '.join(p.value for p in Priority)}"
+        )
+
+
+def require_admin(
+    x_admin_token: str | None = Header(None, description="Admin token")
+) -> None:
+    """Allow a request only when X-Admin-Token matches the configured admin token."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+async def enforce_usage_budget() -> None:
+    """Reject requests from callers that used up their daily Google Ads API budget."""
+    try:
+        usage_tracker.check_budget(current_caller.get())
+    except UsageBudgetExceeded as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
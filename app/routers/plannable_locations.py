@@ -0,0 +1,91 @@
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+import logging
+import math
+
+from app.config import settings
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.location_index import location_catalog
+from app.services.normalization import InvalidRequestError, normalize_location_id
+from app.models.responses import PlannableLocation, PlannableLocationsResponse, ErrorResponse
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.get(
+    "/plannable-locations",
+    response_model=PlannableLocationsResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+        503: {"model": ErrorResponse, "description": "Google Ads API temporarily unavailable"}
+    },
+    summary="Search Plannable Locations",
+    description="Search the plannable locations catalog by name or ID prefix"
+)
+async def get_plannable_locations(
+    query: str | None = Query(
+        None,
+        description="Name or location ID prefix, e.g. 'united' or 'new y'",
+        example="united"
+    ),
+    parent_country_id: str | None = Query(
+        None,
+        description="Only return locations within this country",
+        example="2840"
+    ),
+    limit: int = Query(
+        settings.locations_search_max_results,
+        description="Maximum number of locations returned"
+    )
+):
+    """
+    Search plannable locations.
+    
+    The catalog from ListPlannableLocations is kept in memory and refreshed
+    periodically, so lookups are answered locally. Only the first request after
+    startup (or after a missed refresh) waits for the Google Ads API.
+    
+    Returns:
+        Matching locations, names starting with the query first
+    """
+    try:
+        if not 1 <= limit <= settings.locations_search_max_results:
+            raise HTTPException(
+                status_code=400,
+                detail=f"limit must be between 1 and {settings.locations_search_max_results}"
+            )
+        
+        if parent_country_id is not None:
+            parent_country_id = normalize_location_id(parent_country_id)
+        
+        index = location_catalog.loaded_index() or await run_in_threadpool(location_catalog.get_index)
+        locations = index.search(query, parent_country_id, limit)
+        
+        return PlannableLocationsResponse(
+            locations=[PlannableLocation(**location) for location in locations],
+            total_count=len(locations)
+        )
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions as-is
+        raise
+    except InvalidRequestError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except CircuitOpenError as e:
+        logger.warning(f"Rejected request while circuit is open: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    except Exception as e:
+        logger.error(f"Error fetching plannable locations: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve plannable locations: {str(e)}"
+        )
@@ -1,7 +1,17 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from functools import partial
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import logging
+import math
 
+from app.routers.dependencies import request_priority
+from app.services.admission import AdmissionRejected, Priority, admission_controller
+from app.services.circuit_breaker import CircuitOpenError
 from app.services.google_ads_client import google_ads_service
+from app.services.normalization import InvalidRequestError, normalize_location_id
+from app.services.prewarm import prewarm_scheduler
+from app.services.stale_while_revalidate import products_revalidator, stale_headers
 from app.models.responses import PlannableProduct, ErrorResponse
 
 router = APIRouter()
@@ -13,17 +23,21 @@ logger = logging.getLogger(__name__)
     response_model=list[PlannableProduct],
     responses={
         400: {"model": ErrorResponse, "description": "Bad Request"},
-        500: {"model": ErrorResponse, "description": "Internal Server Error"}
+        429: {"model": ErrorResponse, "description": "Too Many Requests"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+        503: {"model": ErrorResponse, "description": "Google Ads API temporarily unavailable"}
     },
     summary="Get Plannable Products",
     description="Retrieve plannable products for YouTube Reach Curve via Google Ads API"
 )
 async def get_plannable_products(
+    response: Response,
     plannable_location_id: str = Query(
         ..., 
         description="The plannable location ID for which to retrieve products",
         example="2840"  # US location ID
-    )
+    ),
+    priority: Priority = Depends(request_priority)
 ):
     """
     Get plannable products for a specific location.
@@ -33,19 +47,42 @@ async def get_plannable_products(
         
     Returns:
         List of plannable products with name and code
+    
+    With stale-while-revalidate enabled, stale results are marked with
+    X-Cache-Status: STALE and Age headers.
     """
     try:
         logger.info(f"Fetching plannable products for location: {plannable_location_id}")
         
         # Validate input
-        if not plannable_location_id or not plannable_location_id.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="plannable_location_id is required and cannot be empty"
-            )
+        location_id = normalize_location_id(plannable_location_id)
+        
+        refresh = partial(google_ads_service.list_plannable_products, location_id, force_refresh=True)
+        # Background refreshes of stale results take a batch slot
+        admit_refresh = partial(
+            admission_controller.admit_from_thread, asyncio.get_running_loop(), None, Priority.BATCH
+        )
         
-        # Call the Google Ads service
-        products = google_ads_service.list_plannable_products(plannable_location_id.strip())
+        # Cached results are served without waiting for a Google Ads API slot
+        result = await run_in_threadpool(
+            products_revalidator.lookup,
+            location_id,
+            refresh,
+            lambda: google_ads_service.cached_plannable_products(location_id),
+            admit_refresh
+        )
+        if result is None:
+            async with admission_controller.admit(None, priority):
+                result = await run_in_threadpool(
+                    products_revalidator.get,
+                    location_id,
+                    lambda: google_ads_service.list_plannable_products(location_id),
+                    refresh,
+                    admit_refresh
+                )
+        products, stale_age = result
+        response.headers.update(stale_headers(stale_age))
+        prewarm_scheduler.record_location(location_id)
         
         # Convert to response format
         response_products = [
@@ -59,6 +96,25 @@ async def get_plannable_products(
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except InvalidRequestError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except CircuitOpenError as e:
+        logger.warning(f"Rejected request while circuit is open: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected request by admission control: {str(e)}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
     except Exception as e:
         logger.error(f"Error fetching plannable products: {str(e)}")
         raise HTTPException(
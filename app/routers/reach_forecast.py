@@ -1,22 +1,67 @@
-from fastapi import APIRouter, Query, HTTPException
-from app.models.responses import ReachForecastResponse, ReachForecastRequest, ReachForecast
-from app.services.google_ads_client import google_ads_service
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from functools import partial
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.models.responses import (
+    ReachForecastResponse, ReachForecastRequest, ReachForecast, PlannedProduct,
+    ForecastAggregationRequest, ForecastAggregationResponse,
+    BudgetOptimizationRequest, BudgetOptimizationResponse, ErrorResponse
+)
+from app.routers.dependencies import request_priority
+from app.services.admission import AdmissionRejected, Priority, admission_controller
+from app.services.budget_optimizer import optimize_product_mix
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.forecast_aggregation import aggregate_forecasts
+from app.services.google_ads_client import DEFAULT_PLANNED_PRODUCTS, google_ads_service
+from app.services.location_index import location_catalog
+from app.services.prewarm import prewarm_scheduler
+from app.services.normalization import (
+    InvalidRequestError, normalize_forecast_params, normalize_location_ids, normalize_network, request_key
+)
+from app.services.stale_while_revalidate import forecast_revalidator, stale_headers
+import asyncio
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _admitted_forecast_fetch(customer_id: str, priority: Priority):
+    """
+    Build the forecast function of a fan-out request, called from worker threads.
+
+    Each call that is not answered from the reach curve cache holds its own
+    admission slot, so the request is accounted for every upstream call.
+    """
+    loop = asyncio.get_running_loop()
+
+    def fetch(request_params: dict) -> dict:
+        cached = google_ads_service.cached_reach_forecast(request_params)
+        if cached is not None:
+            return cached
+        with admission_controller.admit_from_thread(loop, customer_id, priority):
+            return google_ads_service.generate_reach_forecast(request_params)
+
+    return fetch
+
 
 @router.get("/reach-forecast", response_model=ReachForecastResponse)
 async def get_reach_forecast(
+    response: Response,
     start_date: str = Query(..., description="Campaign start date in YYYY-MM-DD format", example="2025-11-01"),
     end_date: str = Query(..., description="Campaign end date in YYYY-MM-DD format", example="2025-12-01"),
     customer_id: str = Query(..., description="Google Ads customer ID", example="1234567890"),
     user_list_id: str = Query(..., description="User list ID for targeting", example="123456789"),
     plannable_location_id: str = Query(..., description="Plannable location ID", example="2840"),
     network: str = Query(..., description="Network type", example="YOUTUBE"),
-    currency_code: str = Query(..., description="Currency code", example="USD")
+    currency_code: str = Query(..., description="Currency code", example="USD"),
+    planned_products: list[str] | None = Query(
+        None,
+        description="Planned product as CODE:BUDGET_MICROS; repeat for a product mix",
+        example=["TRUEVIEW_IN_STREAM:1000000000000"]
+    ),
+    priority: Priority = Depends(request_priority)
 ):
     """
     Generate reach forecast using Google Ads API.
@@ -24,12 +69,25 @@ async def get_reach_forecast(
     This endpoint calls the Google Ads API GenerateReachForecast method with the specified parameters
     and returns reach curve data with planned products.
     
-    The request includes predefined planned products:
+    Unless planned_products is given, the request includes predefined planned products:
     - TRUEVIEW_IN_STREAM with budget of 1,000,000,000,000 micros
     - NON_SKIP_AUCTION with budget of 1,000,000,000,000 micros
     
+    Parameters are normalized first (dashes in customer IDs, case of codes,
+    whitespace, product order), so equivalent requests share cached results.
+    Requests that differ from an earlier one only in budget are answered from the
+    cached reach curve when it covers the requested budget.
+    
     Implements exponential backoff retry logic for timeout errors (max 3 attempts).
     
+    With stale-while-revalidate enabled, the last good forecast is served immediately
+    (marked with X-Cache-Status: STALE and Age headers) while it is refreshed in the
+    background, and is also served when the Google Ads API call fails.
+    
+    Calls to the Google Ads API are subject to admission control (cached results are
+    served without it): the X-Request-Priority header selects the interactive (default)
+    or batch class, and 429 with Retry-After is returned when the queue is full.
+    
     Request format matches Google Ads API structure:
     - targeting.plannableLocationIds: [plannable_location_id]
     - targeting.network: network type
@@ -37,60 +95,68 @@ async def get_reach_forecast(
     - campaignDuration: uses start_date and end_date
     """
     try:
-        # Validate date format (basic validation)
-        if len(start_date) != 10 or len(end_date) != 10:
-            raise HTTPException(
-                status_code=400,
-                detail="Date format must be YYYY-MM-DD"
-            )
-        
-        # Validate customer_id is numeric
-        if not customer_id.isdigit():
-            raise HTTPException(
-                status_code=400,
-                detail="Customer ID must be numeric"
-            )
-        
-        # Validate network
-        valid_networks = ["YOUTUBE", "YOUTUBE_AND_GOOGLE_VIDEO_PARTNERS"]
-        if network not in valid_networks:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Network must be one of: {', '.join(valid_networks)}"
-            )
-        
-        # Validate currency code (basic validation)
-        if len(currency_code) != 3:
-            raise HTTPException(
-                status_code=400,
-                detail="Currency code must be 3 characters (e.g., USD, EUR)"
-            )
+        # Parse planned products (CODE:BUDGET_MICROS)
+        parsed_products = None
+        if planned_products:
+            parsed_products = []
+            for item in planned_products:
+                code, _, budget = item.partition(":")
+                if not code.strip() or not budget.strip().isdigit() or int(budget) <= 0:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Planned products must be formatted as CODE:BUDGET_MICROS with a positive budget"
+                    )
+                parsed_products.append({"plannable_product_code": code, "budget_micros": int(budget)})
         
-        # Create request parameters
-        request_params = {
-            "start_date": start_date,
-            "end_date": end_date,
-            "customer_id": customer_id,
-            "user_list_id": user_list_id,
-            "plannable_location_id": plannable_location_id,
-            "network": network,
-            "currency_code": currency_code
-        }
+        # Canonical request parameters, shared by every cache layer
+        request_params = normalize_forecast_params(
+            start_date,
+            end_date,
+            customer_id,
+            user_list_id,
+            currency_code,
+            network=network,
+            plannable_location_id=plannable_location_id,
+            planned_products=parsed_products
+        )
+        customer_id = request_params["customer_id"]
         
         logger.info(f"Generating reach forecast for customer {customer_id}")
         
-        # Call the Google Ads service
-        forecast_data = google_ads_service.generate_reach_forecast(request_params)
+        key = request_key(request_params)
+        refresh = partial(google_ads_service.generate_reach_forecast, request_params, force_refresh=True)
+        # Background refreshes of stale results take a batch slot for the customer
+        admit_refresh = partial(
+            admission_controller.admit_from_thread, asyncio.get_running_loop(), customer_id, Priority.BATCH
+        )
+        
+        # Cached results are served without waiting for a Google Ads API slot
+        result = await run_in_threadpool(
+            forecast_revalidator.lookup,
+            key,
+            refresh,
+            lambda: google_ads_service.cached_reach_forecast(request_params),
+            admit_refresh
+        )
+        if result is None:
+            async with admission_controller.admit(customer_id, priority):
+                result = await run_in_threadpool(
+                    forecast_revalidator.get,
+                    key,
+                    lambda: google_ads_service.generate_reach_forecast(request_params),
+                    refresh,
+                    admit_refresh
+                )
+        forecast_data, stale_age = result
+        response.headers.update(stale_headers(stale_age))
+        prewarm_scheduler.record_forecast(request_params)
         
         # Create request object for response
         request_obj = ReachForecastRequest(
-            start_date=start_date,
-            end_date=end_date,
-            customer_id=customer_id,
-            user_list_id=user_list_id,
-            plannable_location_id=plannable_location_id,
-            network=network,
-            currency_code=currency_code
+            **{key: value for key, value in request_params.items() if key != "planned_products"},
+            planned_products=[
+                PlannedProduct(**product) for product in request_params.get("planned_products", [])
+            ] or None
         )
         
         # Create forecast object
@@ -105,9 +171,245 @@ async def get_reach_forecast(
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except InvalidRequestError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except CircuitOpenError as e:
+        logger.warning(f"Rejected request while circuit is open: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected request by admission control: {str(e)}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
     except Exception as e:
         logger.error(f"Error generating reach forecast: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Error generating reach forecast: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post(
+    "/reach-forecast/aggregate",
+    response_model=ForecastAggregationResponse,
+    responses={
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse}
+    }
+)
+async def aggregate_reach_forecast(
+    body: ForecastAggregationRequest,
+    priority: Priority = Depends(request_priority)
+):
+    """
+    Generate reach forecasts for several markets and networks and aggregate them.
+    
+    The service decides which upstream requests are needed:
+    - With include_market_curves (default), every (location, network) pair is
+      forecast separately and returned as its own curve.
+    - Otherwise locations sharing a parent country (looked up in the plannable
+      locations catalog) are combined into one request per network.
+    
+    The calls run concurrently and each network gets an aggregated curve that adds
+    up the reach of the (disjoint) markets, assuming every market spends the same
+    share of its budget. Markets whose forecast failed are listed in
+    missing_location_ids instead of failing the whole request.
+    
+    Every upstream call takes its own admission slot; 429 with Retry-After is
+    returned when one of them is rejected, and 503 with Retry-After while the
+    circuit breaker for the API is open.
+    """
+    try:
+        if not body.plannable_location_ids or not body.networks:
+            raise HTTPException(
+                status_code=400,
+                detail="plannable_location_ids and networks must be non-empty"
+            )
+        
+        base_params = normalize_forecast_params(
+            body.start_date,
+            body.end_date,
+            body.customer_id,
+            body.user_list_id,
+            body.currency_code,
+            planned_products=[product.model_dump() for product in body.planned_products or []]
+        )
+        location_ids = normalize_location_ids(body.plannable_location_ids)
+        networks = list(dict.fromkeys(normalize_network(network) for network in body.networks))
+        if len(location_ids) > settings.aggregate_max_markets:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.aggregate_max_markets} locations can be aggregated"
+            )
+        customer_id = base_params["customer_id"]
+        
+        logger.info(
+            f"Aggregating reach forecasts for customer {customer_id}: "
+            f"{len(location_ids)} locations, {len(networks)} networks"
+        )
+        
+        parent_country_ids = None
+        if not body.include_market_curves:
+            parent_country_ids = await run_in_threadpool(location_catalog.parent_country_ids, location_ids)
+        
+        result = await run_in_threadpool(
+            aggregate_forecasts,
+            base_params,
+            location_ids,
+            networks,
+            body.include_market_curves,
+            _admitted_forecast_fetch(customer_id, priority),
+            settings.aggregate_max_parallel_calls,
+            parent_country_ids
+        )
+        
+        request_parameters = body.model_copy(update={
+            **{key: value for key, value in base_params.items() if key != "planned_products"},
+            "plannable_location_ids": location_ids,
+            "networks": networks
+        })
+        return ForecastAggregationResponse(**result, request_parameters=request_parameters)
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions as-is
+        raise
+    except InvalidRequestError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except CircuitOpenError as e:
+        logger.warning(f"Rejected request while circuit is open: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected request by admission control: {str(e)}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    except Exception as e:
+        logger.error(f"Error aggregating reach forecasts: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error aggregating reach forecasts: {str(e)}"
+        )
+
+
+@router.post(
+    "/reach-forecast/optimize",
+    response_model=BudgetOptimizationResponse,
+    responses={
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse}
+    }
+)
+async def optimize_budget_allocation(
+    body: BudgetOptimizationRequest,
+    priority: Priority = Depends(request_priority)
+):
+    """
+    Recommend how to split a budget between products to maximize reach.
+    
+    One reach curve per product (TRUEVIEW_IN_STREAM and NON_SKIP_AUCTION unless
+    product_codes is given) is forecast with the whole budget, usually from the
+    reach curve cache. The budget is then allocated in small increments to the
+    product with the highest marginal reach, without an upstream call per
+    candidate split.
+    
+    estimated_reach adds up the single-product curves and overstates reach when
+    audiences overlap. With validate_allocation (default), the recommended mix is
+    forecast once and its reach at the full budget is returned as expected_reach;
+    if that forecast fails, the recommendation is returned with validation_error.
+    
+    Every upstream call takes its own admission slot.
+    """
+    try:
+        base_params = normalize_forecast_params(
+            body.start_date,
+            body.end_date,
+            body.customer_id,
+            body.user_list_id,
+            body.currency_code,
+            network=body.network,
+            plannable_location_id=body.plannable_location_id
+        )
+        
+        if body.budget_micros <= 0:
+            raise HTTPException(
+                status_code=400,
+                detail="budget_micros must be positive"
+            )
+        
+        product_codes = list(dict.fromkeys(
+            code.strip().upper()
+            for code in body.product_codes or [p["plannable_product_code"] for p in DEFAULT_PLANNED_PRODUCTS]
+        ))
+        if not all(product_codes) or not 1 <= len(product_codes) <= settings.optimizer_max_products:
+            raise HTTPException(
+                status_code=400,
+                detail=f"product_codes must contain between 1 and {settings.optimizer_max_products} products"
+            )
+        customer_id = base_params["customer_id"]
+        
+        logger.info(f"Optimizing product mix for customer {customer_id} across {len(product_codes)} products")
+        
+        result = await run_in_threadpool(
+            optimize_product_mix,
+            base_params,
+            product_codes,
+            body.budget_micros,
+            _admitted_forecast_fetch(customer_id, priority),
+            settings.aggregate_max_parallel_calls,
+            settings.optimizer_steps,
+            body.validate_allocation
+        )
+        
+        request_parameters = body.model_copy(update={**base_params, "product_codes": product_codes})
+        return BudgetOptimizationResponse(**result, request_parameters=request_parameters)
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions as-is
+        raise
+    except InvalidRequestError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except CircuitOpenError as e:
+        logger.warning(f"Rejected request while circuit is open: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected request by admission control: {str(e)}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    except Exception as e:
+        logger.error(f"Error optimizing budget allocation: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error optimizing budget allocation: {str(e)}"
+        )
@@ -0,0 +1,236 @@
+from collections import Counter
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+import asyncio
+import itertools
+import logging
+import math
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Flow of requests not made for a customer, e.g. plannable products
+_NO_CUSTOMER = "-"
+
+
+class Priority(str, Enum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be queued or waited too long for a slot."""
+
+    def __init__(self, message: str, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+@dataclass(order=True)
+class _Waiter:
+    finish_tag: float
+    sequence: int
+    customer_id: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class AdmissionController:
+    """
+    Admission control in front of the Google Ads API calls.
+
+    Requests run when a slot is free, subject to a global concurrency limit
+    and a per-customer concurrency cap. Waiting requests are ordered by
+    weighted fair queuing (self-clocked): each (customer, priority) flow gets
+    a share proportional to its priority weight, so a customer issuing a large
+    batch cannot starve interactive requests from others. Requests are
+    rejected with a retry hint when the queue is full or the wait times out.
+
+    Requests made without a customer share one flow that is only bound by
+    the global limits, not by the per-customer cap and queue.
+    """
+
+    def __init__(self, max_concurrency: int, per_customer_concurrency: int, max_queue: int,
+                 max_queue_per_customer: int, queue_timeout_seconds: float,
+                 weights: dict[Priority, float], enabled: bool = True):
+        self.max_concurrency = max_concurrency
+        self.per_customer_concurrency = per_customer_concurrency
+        self.max_queue = max_queue
+        self.max_queue_per_customer = max_queue_per_customer
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.weights = weights
+        self.enabled = enabled
+        self._active = 0
+        self._active_by_customer: Counter[str] = Counter()
+        self._queued_by_customer: Counter[str] = Counter()
+        self._waiters: list[_Waiter] = []
+        self._virtual_time = 0.0
+        self._last_finish: dict[tuple[str, Priority], float] = {}
+        self._sequence = itertools.count()
+        self._avg_service_seconds = 1.0
+
+    def _retry_after(self) -> float:
+        """Estimate how long until the current queue drains."""
+        batches = len(self._waiters) / max(self.max_concurrency, 1) + 1
+        return max(math.ceil(self._avg_service_seconds * batches), 1)
+
+    def _dispatch(self) -> None:
+        """Start waiting requests, lowest finish tag first, while slots are free."""
+        self._waiters.sort()
+        index = 0
+        while self._active < self.max_concurrency and index < len(self._waiters):
+            waiter = self._waiters[index]
+            if waiter.future.done() or self._customer_at_cap(waiter.customer_id):
+                index += 1
+                continue
+            self._waiters.pop(index)
+            self._dequeued(waiter.customer_id)
+            self._virtual_time = waiter.finish_tag
+            self._active += 1
+            self._active_by_customer[waiter.customer_id] += 1
+            waiter.future.set_result(None)
+
+    def _customer_at_cap(self, customer_id: str) -> bool:
+        return (customer_id != _NO_CUSTOMER
+                and self._active_by_customer[customer_id] >= self.per_customer_concurrency)
+
+    def _release(self, customer_id: str, service_seconds: float) -> None:
+        self._active -= 1
+        self._active_by_customer[customer_id] -= 1
+        if self._active_by_customer[customer_id] <= 0:
+            del self._active_by_customer[customer_id]
+        self._avg_service_seconds = 0.9 * self._avg_service_seconds + 0.1 * service_seconds
+        if len(self._last_finish) > 1024:
+            # Tags behind the virtual clock no longer affect scheduling
+            self._last_finish = {
+                flow: tag for flow, tag in self._last_finish.items() if tag > self._virtual_time
+            }
+        self._dispatch()
+
+    def _dequeued(self, customer_id: str) -> None:
+        self._queued_by_customer[customer_id] -= 1
+        if self._queued_by_customer[customer_id] <= 0:
+            del self._queued_by_customer[customer_id]
+
+    def _remove_waiter(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+            self._dequeued(waiter.customer_id)
+
+    @asynccontextmanager
+    async def admit(self, customer_id: str | None, priority: Priority = Priority.INTERACTIVE):
+        """
+        Wait for a slot for ``customer_id`` and hold it for the duration of the block.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait times out
+        """
+        if not self.enabled:
+            yield
+            return
+
+        customer_id = customer_id or _NO_CUSTOMER
+        if (len(self._waiters) >= self.max_queue
+                or (customer_id != _NO_CUSTOMER
+                    and self._queued_by_customer[customer_id] >= self.max_queue_per_customer)):
+            raise AdmissionRejected(
+                "Too many requests queued for the Google Ads API, please retry later",
+                self._retry_after(),
+            )
+
+        flow = (customer_id, priority)
+        finish_tag = max(self._virtual_time, self._last_finish.get(flow, 0.0)) + 1 / self.weights[priority]
+        self._last_finish[flow] = finish_tag
+        waiter = _Waiter(
+            finish_tag,
+            next(self._sequence),
+            customer_id,
+            asyncio.get_running_loop().create_future(),
+        )
+        self._waiters.append(waiter)
+        self._queued_by_customer[customer_id] += 1
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout_seconds)
+        except TimeoutError:
+            self._remove_waiter(waiter)
+            if waiter.future.done():
+                # Admitted just as the wait timed out; give the slot back
+                self._release(customer_id, 0.0)
+            raise AdmissionRejected(
+                "Timed out waiting for a Google Ads API slot, please retry later",
+                self._retry_after(),
+            )
+        except BaseException:
+            self._remove_waiter(waiter)
+            if waiter.future.done():
+                self._release(customer_id, 0.0)
+            raise
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(customer_id, time.monotonic() - started)
+
+    @contextmanager
+    def admit_from_thread(self, loop: asyncio.AbstractEventLoop, customer_id: str | None,
+                          priority: Priority = Priority.INTERACTIVE):
+        """
+        Hold a slot around a block running in a worker thread.
+
+        Used for the upstream calls of a fan-out, so each call takes a slot of
+        its own. The slot is taken and given back on ``loop``, the event loop
+        the controller is used from.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait times out
+        """
+        admitted: Future = Future()
+        release: asyncio.Event | None = None
+
+        async def hold():
+            nonlocal release
+            release = asyncio.Event()
+            try:
+                async with self.admit(customer_id, priority):
+                    admitted.set_result(None)
+                    await release.wait()
+            except BaseException as e:
+                if not admitted.done():
+                    admitted.set_exception(e)
+                raise
+
+        held = asyncio.run_coroutine_threadsafe(hold(), loop)
+        admitted.result()
+        try:
+            yield
+        finally:
+            loop.call_soon_threadsafe(release.set)
+            held.result()
+
+    def snapshot(self) -> dict:
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            "active_by_customer": dict(self._active_by_customer),
+        }
+
+
+# Global instance
+admission_controller = AdmissionController(
+    max_concurrency=settings.admission_max_concurrency,
+    per_customer_concurrency=settings.admission_per_customer_concurrency,
+    max_queue=settings.admission_max_queue,
+    max_queue_per_customer=settings.admission_max_queue_per_customer,
+    queue_timeout_seconds=settings.admission_queue_timeout_seconds,
+    weights={
+        Priority.INTERACTIVE: settings.admission_interactive_weight,
+        Priority.BATCH: settings.admission_batch_weight,
+    },
+    enabled=settings.admission_enabled,
+)
@@ -0,0 +1,168 @@
+from collections.abc import Callable
+import heapq
+import logging
+
+from app.services.admission import AdmissionRejected
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.forecast_aggregation import ForecastCall, run_forecast_calls
+from app.services.google_ads_client import forecast_location_ids
+from app.services.reach_curve_cache import interpolate_curve
+
+logger = logging.getLogger(__name__)
+
+
+def _prepare_curve(points: list[dict]) -> tuple[list[dict], list[int]]:
+    points = sorted(points, key=lambda point: point["cost_micros"])
+    return points, [point["cost_micros"] for point in points]
+
+
+def estimate_reach(curves: dict[str, list[dict]], allocation: dict[str, float]) -> int:
+    """
+    Estimate the reach of a product mix from single-product reach curves.
+
+    The reach of the products is added up, so audiences reached by several
+    products are counted more than once; the result is an upper bound.
+    """
+    reach = 0.0
+    for code, budget in allocation.items():
+        if budget > 0 and curves.get(code):
+            points, costs = _prepare_curve(curves[code])
+            reach += interpolate_curve(points, costs, budget, "reach")
+    return int(round(reach))
+
+
+def optimize_allocation(curves: dict[str, list[dict]], budget_micros: int, steps: int) -> dict[str, int]:
+    """
+    Split a budget between products to maximize reach.
+
+    The budget is divided into ``steps`` equal increments and each increment
+    goes to the product whose curve gains the most reach from it. For concave
+    reach curves this greedy marginal-return allocation is optimal up to the
+    step size.
+
+    Args:
+        curves: Single-product reach curve per product code
+        budget_micros: Budget to allocate
+        steps: Number of budget increments
+
+    Returns:
+        Budget in micros per product code, adding up to ``budget_micros``
+    """
+    prepared = {code: _prepare_curve(points) for code, points in curves.items() if points}
+    if not prepared:
+        return {}
+
+    step = budget_micros / steps
+    units = dict.fromkeys(prepared, 0)
+
+    def gain(code: str) -> float:
+        points, costs = prepared[code]
+        spent = units[code] * step
+        return (interpolate_curve(points, costs, spent + step, "reach")
+                - interpolate_curve(points, costs, spent, "reach"))
+
+    # Highest marginal gain first; ties go to the product listed first
+    heap = [(-gain(code), order, code) for order, code in enumerate(prepared)]
+    heapq.heapify(heap)
+    for _ in range(steps):
+        _, order, code = heapq.heappop(heap)
+        units[code] += 1
+        heapq.heappush(heap, (-gain(code), order, code))
+
+    allocation = {code: units[code] * budget_micros // steps for code in prepared}
+    # Give the rounding remainder to the largest allocation
+    largest = max(allocation, key=allocation.get)
+    allocation[largest] += budget_micros - sum(allocation.values())
+    return allocation
+
+
+def optimize_product_mix(base_params: dict, product_codes: list[str], budget_micros: int,
+                         fetch: Callable[[dict], dict], max_parallel: int, steps: int,
+                         validate: bool = True) -> dict:
+    """
+    Recommend the product mix with the highest reach for a fixed budget.
+
+    One forecast per product, each with the whole budget, provides that
+    product's reach curve over any smaller spend. These curves usually come
+    from the reach curve cache, so candidate splits are evaluated locally
+    rather than with one upstream call each. The recommended mix is then
+    forecast once to report its actual (deduplicated) reach.
+
+    Args:
+        base_params: Forecast request parameters without planned products
+        product_codes: Plannable product codes to choose from
+        budget_micros: Total budget to allocate
+        fetch: Function running a single forecast request
+        max_parallel: Maximum number of concurrent upstream calls
+        steps: Number of budget increments used by the optimizer
+        validate: Whether to forecast the recommended mix
+
+    Returns:
+        Dictionary with the recommended ``allocation``, reach estimates and
+        the ``validated_forecast`` of the recommended mix, or the
+        ``validation_error`` when forecasting the mix failed
+
+    Raises:
+        AdmissionRejected: If a forecast was rejected by admission control
+        CircuitOpenError: If a forecast was rejected by an open circuit breaker
+        Exception: If no product curve could be forecast
+    """
+    product_codes = list(dict.fromkeys(product_codes))
+    calls = [
+        ForecastCall(
+            base_params["network"],
+            forecast_location_ids(base_params),
+            {
+                **base_params,
+                "planned_products": [{"plannable_product_code": code, "budget_micros": budget_micros}],
+            },
+        )
+        for code in product_codes
+    ]
+    results = run_forecast_calls(calls, fetch, max_parallel)
+
+    curves = {}
+    unavailable_products = []
+    for code, (forecast, _) in zip(product_codes, results, strict=True):
+        if forecast is None:
+            unavailable_products.append(code)
+        else:
+            curves[code] = forecast["reach_curve"]
+    if not curves:
+        raise Exception(f"Could not forecast reach for any of the products: {', '.join(product_codes)}")
+
+    allocation = optimize_allocation(curves, budget_micros, steps)
+    even_split = dict.fromkeys(curves, budget_micros / len(curves))
+    planned_products = [
+        {"plannable_product_code": code, "budget_micros": budget}
+        for code, budget in allocation.items() if budget > 0
+    ]
+    logger.info(f"Recommended product mix: {planned_products}")
+
+    validated_forecast = None
+    expected_reach = None
+    validation_error = None
+    if validate:
+        try:
+            validated_forecast = fetch({**base_params, "planned_products": planned_products})
+        except (AdmissionRejected, CircuitOpenError):
+            raise
+        except Exception as e:
+            # The recommendation stands without its validation
+            logger.warning(f"Validating the recommended product mix failed: {str(e)}")
+            validation_error = str(e)
+        else:
+            points, costs = _prepare_curve(validated_forecast["reach_curve"])
+            if points:
+                expected_reach = int(round(interpolate_curve(points, costs, budget_micros, "reach")))
+
+    return {
+        "allocation": planned_products,
+        "estimated_reach": estimate_reach(curves, allocation),
+        "even_split_estimated_reach": estimate_reach(curves, even_split),
+        "expected_reach": expected_reach,
+        "validated_forecast": validated_forecast,
+        "validation_error": validation_error,
+        "unavailable_products": unavailable_products,
+        "forecast_calls": len(calls) + (1 if validate else 0),
+    }
@@ -0,0 +1,250 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, NamedTuple
+import json
+import sqlite3
+import threading
+import time
+
+from app.config import settings
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    stored_at: float
+    ttl_seconds: float | None = None  # Overrides the cache's TTL for this entry
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def is_fresh(self, default_ttl_seconds: float) -> bool:
+        ttl_seconds = default_ttl_seconds if self.ttl_seconds is None else self.ttl_seconds
+        return self.age <= ttl_seconds
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache with a time-to-live and LRU eviction.
+
+    Args:
+        ttl_seconds: How long an entry is considered fresh
+        max_entries: Maximum number of entries kept before the least recently
+            used ones are evicted
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the cached value if present and fresh, otherwise None."""
+        entry = self.get_entry(key)
+        if entry is None or not entry.is_fresh(self.ttl_seconds):
+            return None
+        return entry.value
+
+    def get_entry(self, key: str) -> CacheEntry | None:
+        """Return the cache entry for a key regardless of its age."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value, ttl_seconds: float | None = None) -> None:
+        """Store a value, fresh for ``ttl_seconds`` instead of the cache's TTL when given."""
+        with self._lock:
+            self._entries[key] = CacheEntry(value, time.time(), ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def update(self, key: str, update: Callable[[Any], Any], ttl_seconds: float | None = None) -> None:
+        """Replace the value of a key with ``update(fresh value or None)`` atomically."""
+        with self._lock:
+            entry = self._entries.get(key)
+            current = entry.value if entry is not None and entry.is_fresh(self.ttl_seconds) else None
+            self._entries[key] = CacheEntry(update(current), time.time(), ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    Cache stored in a local SQLite file shared by every worker process on a host.
+
+    Entries are JSON-encoded and written with ``INSERT OR REPLACE`` in their
+    own transaction, so readers in other processes never see partial writes.
+    Expired entries and entries beyond ``max_entries`` (oldest first) are
+    evicted periodically on write.
+
+    Args:
+        path: Path of the SQLite database file
+        namespace: Namespace separating this cache from others in the same file
+        ttl_seconds: How long an entry is considered fresh
+        max_entries: Maximum number of entries kept in the namespace
+        retention_seconds: How long entries are kept at all; defaults to
+            ``ttl_seconds`` and may be longer for callers that serve stale data.
+            Entries stored with a longer TTL of their own are kept for that TTL
+    """
+
+    EVICT_EVERY_WRITES = 64
+
+    def __init__(self, path: str, namespace: str, ttl_seconds: float, max_entries: int,
+                 retention_seconds: float | None = None):
+        self.path = path
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.retention_seconds = max(retention_seconds or ttl_seconds, ttl_seconds)
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, ttl_seconds REAL, PRIMARY KEY (namespace, key))"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")}
+            if "ttl_seconds" not in columns:
+                # Files created before entries could carry their own TTL
+                conn.execute("ALTER TABLE cache_entries ADD COLUMN ttl_seconds REAL")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_entries_stored_at"
+                " ON cache_entries (namespace, stored_at)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        """Return the cached value if present and fresh, otherwise None."""
+        entry = self.get_entry(key)
+        if entry is None or not entry.is_fresh(self.ttl_seconds):
+            return None
+        return entry.value
+
+    def _read_entry(self, conn: sqlite3.Connection, key: str) -> CacheEntry | None:
+        row = conn.execute(
+            "SELECT value, stored_at, ttl_seconds FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None or time.time() - row[1] > max(self.retention_seconds, row[2] or 0):
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+
+    def get_entry(self, key: str) -> CacheEntry | None:
+        """Return the cache entry for a key regardless of its age, within retention."""
+        return self._read_entry(self._connection(), key)
+
+    def _write(self, conn: sqlite3.Connection, key: str, value, ttl_seconds: float | None) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, stored_at, ttl_seconds)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, key, json.dumps(value), time.time(), ttl_seconds),
+        )
+
+    def set(self, key: str, value, ttl_seconds: float | None = None) -> None:
+        """Store a value, fresh for ``ttl_seconds`` instead of the cache's TTL when given."""
+        conn = self._connection()
+        with conn:
+            self._write(conn, key, value, ttl_seconds)
+        self._count_write()
+
+    def update(self, key: str, update: Callable[[Any], Any], ttl_seconds: float | None = None) -> None:
+        """
+        Replace the value of a key with ``update(fresh value or None)`` atomically.
+
+        The read and the write happen in one ``BEGIN IMMEDIATE`` transaction,
+        so concurrent updates from other threads or processes are not lost.
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            entry = self._read_entry(conn, key)
+            current = entry.value if entry is not None and entry.is_fresh(self.ttl_seconds) else None
+            self._write(conn, key, update(current), ttl_seconds)
+        self._count_write()
+
+    def _count_write(self) -> None:
+        with self._writes_lock:
+            self._writes += 1
+            evict = self._writes % self.EVICT_EVERY_WRITES == 1
+        if evict:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove expired entries and trim the namespace to ``max_entries``."""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ?"
+                " AND stored_at + MAX(?, COALESCE(ttl_seconds, 0)) < ?",
+                (self.namespace, self.retention_seconds, time.time()),
+            )
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                " SELECT key FROM cache_entries WHERE namespace = ?"
+                " ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.max_entries),
+            )
+
+    def delete(self, key: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+
+    def clear(self) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def __len__(self) -> int:
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        return row[0]
+
+
+def create_cache(namespace: str, ttl_seconds: float, max_entries: int,
+                 retention_seconds: float | None = None):
+    """
+    Create a cache using the backend configured in ``settings.cache_backend``.
+
+    The ``memory`` backend keeps entries per process and bounds them by count
+    only; the ``sqlite`` backend shares entries between all worker processes
+    using ``settings.cache_sqlite_path``.
+    """
+    if settings.cache_backend == "sqlite":
+        return SQLiteCache(
+            settings.cache_sqlite_path, namespace, ttl_seconds, max_entries, retention_seconds
+        )
+    if settings.cache_backend != "memory":
+        raise ValueError(f"Unknown cache backend: {settings.cache_backend}")
+    return TTLCache(ttl_seconds, max_entries)
@@ -0,0 +1,103 @@
+from enum import Enum
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(
+            f"Google Ads API {name} is temporarily unavailable, retry in {retry_after:.0f} seconds"
+        )
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for a single upstream RPC.
+
+    The circuit opens after ``failure_threshold`` consecutive failures and
+    rejects calls for ``reset_timeout_seconds``. It then lets up to
+    ``half_open_max_calls`` trial calls through; a successful trial closes
+    the circuit again and a failed one re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout_seconds: float,
+                 half_open_max_calls: int = 1, enabled: bool = True):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.enabled = enabled
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        if (self._state == CircuitState.OPEN
+                and time.monotonic() - self._opened_at >= self.reset_timeout_seconds):
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """Reserve a call, raising CircuitOpenError when the circuit rejects it."""
+        if not self.enabled:
+            return
+        with self._lock:
+            state = self._current_state()
+            if state == CircuitState.CLOSED:
+                return
+            if state == CircuitState.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return
+            retry_after = max(self.reset_timeout_seconds - (time.monotonic() - self._opened_at), 1)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CircuitState.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = CircuitState.CLOSED
+            self._consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            state = self._current_state()
+            if state == CircuitState.OPEN:
+                return
+            if state == CircuitState.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                logger.warning(
+                    f"Circuit for {self.name} opened after {self._consecutive_failures} consecutive failures"
+                )
+                self._state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._current_state().value,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_seconds": self.reset_timeout_seconds,
+            }
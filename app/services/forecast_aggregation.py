@@ -0,0 +1,212 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import contextvars
+import logging
+
+from app.services.admission import AdmissionRejected
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.google_ads_client import DEFAULT_PLANNED_PRODUCTS
+from app.services.reach_curve_cache import interpolate_curve, total_budget_micros
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ForecastCall:
+    """One upstream forecast covering one or more locations on one network."""
+    network: str
+    plannable_location_ids: list[str]
+    request_params: dict
+
+
+def group_locations(location_ids: list[str], parent_country_ids: dict[str, str] | None = None):
+    """
+    Group locations that can share one forecast request.
+
+    ``GenerateReachForecast`` only accepts several locations when they share
+    the same parent country, so locations are grouped by parent country.
+    Locations whose parent is unknown (including countries) stay on their own.
+    """
+    parent_country_ids = parent_country_ids or {}
+    groups: dict[str, list[str]] = {}
+    for location_id in location_ids:
+        parent = parent_country_ids.get(location_id)
+        groups.setdefault(f"parent:{parent}" if parent else f"location:{location_id}", []).append(location_id)
+    return list(groups.values())
+
+
+def plan_forecast_calls(base_params: dict, location_ids: list[str], networks: list[str],
+                        include_market_curves: bool,
+                        parent_country_ids: dict[str, str] | None = None) -> list[ForecastCall]:
+    """
+    Decide which upstream forecasts are needed for a set of markets and networks.
+
+    With per-market curves every (location, network) pair needs its own call.
+    Otherwise locations sharing a parent country are combined into a single
+    request per network, so the number of calls grows with the number of
+    countries rather than the number of markets.
+
+    The planned budget is per market in both cases: a combined request plans
+    it once for every market it covers.
+    """
+    planned_products = base_params.get("planned_products") or DEFAULT_PLANNED_PRODUCTS
+    location_ids = list(dict.fromkeys(location_ids))
+    networks = list(dict.fromkeys(networks))
+
+    if include_market_curves:
+        groups = [[location_id] for location_id in location_ids]
+    else:
+        groups = group_locations(location_ids, parent_country_ids)
+
+    calls = []
+    for network in networks:
+        for group in groups:
+            params = {key: value for key, value in base_params.items() if key != "plannable_location_ids"}
+            params["network"] = network
+            params["plannable_location_id"] = group[0]
+            if len(group) > 1:
+                params["plannable_location_ids"] = list(group)
+                params["planned_products"] = [
+                    {**product, "budget_micros": product["budget_micros"] * len(group)}
+                    for product in planned_products
+                ]
+            calls.append(ForecastCall(network, list(group), params))
+    return calls
+
+
+def run_forecast_calls(calls: list[ForecastCall], fetch: Callable[[dict], dict],
+                       max_parallel: int) -> list[tuple[dict | None, str | None]]:
+    """
+    Run forecast calls concurrently.
+
+    A failed call is reported in its result, except when ``fetch`` could not
+    get a slot from admission control or the circuit of the API is open:
+    the request then fails fast rather than being answered with a partial
+    result.
+
+    Returns:
+        One (forecast, error) tuple per call, in the order of ``calls``
+
+    Raises:
+        AdmissionRejected: If a call was rejected by admission control
+        CircuitOpenError: If a call was rejected by an open circuit breaker
+    """
+    def run(call: ForecastCall):
+        try:
+            return fetch(call.request_params), None
+        except (AdmissionRejected, CircuitOpenError):
+            raise
+        except Exception as e:
+            logger.warning(
+                f"Forecast for locations {call.plannable_location_ids} on {call.network} failed: {str(e)}"
+            )
+            return None, str(e)
+
+    if len(calls) <= 1 or max_parallel <= 1:
+        return [run(call) for call in calls]
+
+    with ThreadPoolExecutor(max_workers=min(max_parallel, len(calls))) as executor:
+        # Each call runs in a copy of the caller's context
+        futures = [executor.submit(contextvars.copy_context().run, run, call) for call in calls]
+        return [future.result() for future in futures]
+
+
+def sum_reach_curves(curves: list[tuple[int, list[dict]]]) -> list[dict]:
+    """
+    Add up reach curves of disjoint markets.
+
+    Each curve is given with the budget it was forecast for. Curves are
+    aligned by the share of that budget spent, so the aggregated point at
+    share ``f`` assumes every market spends ``f`` of its own budget. Reach and
+    impressions of disjoint markets add up; frequency is derived from them.
+
+    Args:
+        curves: List of (budget_micros, reach_curve) tuples
+
+    Returns:
+        Aggregated reach curve
+    """
+    prepared = []
+    for budget, points in curves:
+        if budget > 0 and points:
+            points = sorted(points, key=lambda point: point["cost_micros"])
+            prepared.append((budget, points, [point["cost_micros"] for point in points]))
+    if not prepared:
+        return []
+
+    shares = sorted({
+        min(cost / budget, 1.0) for budget, _, costs in prepared for cost in costs
+    })
+    aggregated = []
+    for share in shares:
+        cost = reach = impressions = 0.0
+        for budget, points, costs in prepared:
+            market_cost = share * budget
+            cost += market_cost
+            reach += interpolate_curve(points, costs, market_cost, "reach")
+            impressions += interpolate_curve(points, costs, market_cost, "impressions")
+        aggregated.append({
+            "cost_micros": int(round(cost)),
+            "reach": int(round(reach)),
+            "impressions": int(round(impressions)),
+            "frequency": impressions / reach if reach else 0.0,
+        })
+    return aggregated
+
+
+def aggregate_forecasts(base_params: dict, location_ids: list[str], networks: list[str],
+                        include_market_curves: bool, fetch: Callable[[dict], dict],
+                        max_parallel: int,
+                        parent_country_ids: dict[str, str] | None = None) -> dict:
+    """
+    Forecast a set of markets on a set of networks and aggregate them per network.
+
+    Args:
+        base_params: Forecast request parameters shared by all markets; the
+            planned budget is spent in every market
+        location_ids: Plannable location IDs of the markets
+        networks: Networks to forecast
+        include_market_curves: Whether every market needs its own curve
+        fetch: Function running a single forecast request
+        max_parallel: Maximum number of concurrent upstream calls
+        parent_country_ids: Known parent country per location, used to combine requests
+
+    Returns:
+        Dictionary with the individual ``forecasts``, per-network ``aggregates``
+        and the number of ``forecast_calls`` made
+    """
+    calls = plan_forecast_calls(
+        base_params, location_ids, networks, include_market_curves, parent_country_ids
+    )
+    results = run_forecast_calls(calls, fetch, max_parallel)
+
+    forecasts = []
+    curves_by_network: dict[str, list[tuple[int, list[dict]]]] = {}
+    covered_by_network: dict[str, list[str]] = {}
+    missing_by_network: dict[str, list[str]] = {}
+    for call, (forecast, error) in zip(calls, results, strict=True):
+        forecasts.append({
+            "network": call.network,
+            "plannable_location_ids": call.plannable_location_ids,
+            "forecast": forecast,
+            "error": error,
+        })
+        if forecast is None:
+            missing_by_network.setdefault(call.network, []).extend(call.plannable_location_ids)
+        else:
+            budget = total_budget_micros(call.request_params.get("planned_products") or DEFAULT_PLANNED_PRODUCTS)
+            curves_by_network.setdefault(call.network, []).append((budget, forecast["reach_curve"]))
+            covered_by_network.setdefault(call.network, []).extend(call.plannable_location_ids)
+
+    aggregates = [
+        {
+            "network": network,
+            "plannable_location_ids": covered_by_network.get(network, []),
+            "missing_location_ids": missing_by_network.get(network, []),
+            "reach_curve": sum_reach_curves(curves_by_network.get(network, [])),
+        }
+        for network in dict.fromkeys(call.network for call in calls)
+    ]
+
+    return {"forecasts": forecasts, "aggregates": aggregates, "forecast_calls": len(calls)}
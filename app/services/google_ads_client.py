@@ -1,21 +1,176 @@
-from google.ads.googleads.client import GoogleAdsClient
-from google.ads.googleads.errors import GoogleAdsException
+from app import metrics
 from app.config import settings
+from app.services.cache import create_cache
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.hedging import HedgeBudget, Hedger
+from app.services.profiler import section_timers
+from app.services.proto_utils import extract_fields, to_raw_proto
+from app.services.reach_curve_cache import ReachCurveCache
+from app.services.usage import usage_tracker
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+import importlib
 import logging
+import sys
 import time
 import random
 
 logger = logging.getLogger(__name__)
 
+# Upstream RPCs guarded by a circuit breaker
+UPSTREAM_RPCS = ("ListPlannableLocations", "ListPlannableProducts", "Search", "GenerateReachForecast")
+
+# Idempotent reads that may be hedged
+HEDGED_RPCS = ("ListPlannableLocations", "ListPlannableProducts", "Search")
+
+# gRPC status code names that indicate the API itself is failing, as opposed to a bad request
+UPSTREAM_FAILURE_CODES = {
+    "UNAVAILABLE",
+    "DEADLINE_EXCEEDED",
+    "INTERNAL",
+    "RESOURCE_EXHAUSTED",
+    "UNKNOWN",
+}
+
+# Services and request types used by this module, preloaded by warm_up()
+USED_SERVICES = ("ReachPlanService", "GoogleAdsService")
+USED_TYPES = (
+    "ListPlannableLocationsRequest",
+    "ListPlannableProductsRequest",
+    "SearchGoogleAdsRequest",
+    "GenerateReachForecastRequest",
+    "CampaignDuration",
+    "DateRange",
+    "UserListInfo",
+    "PlannedProduct",
+)
+
+# Response field paths, keyed by the names used in the API output
+PLANNABLE_LOCATION_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "parent_country_id": "parent_country_id",
+    "country_code": "country_code",
+    "location_type": "location_type",
+}
+PLANNABLE_PRODUCT_FIELDS = {
+    "name": "plannable_product_name",
+    "code": "plannable_product_code",
+}
+CUSTOMER_CLIENT_FIELDS = {
+    "id": "customer_client.id",
+    "name": "customer_client.descriptive_name",
+}
+REACH_CURVE_POINT_FIELDS = {
+    "cost_micros": "cost_micros",
+    "reach": "forecast_metrics.reach",
+    "impressions": "forecast_metrics.impressions",
+    "frequency": "forecast_metrics.frequency",
+}
+PLANNED_PRODUCT_FIELDS = {
+    "plannable_product_code": "plannable_product_code",
+    "budget_micros": "budget_micros",
+}
+
+# Product mix used when a forecast request does not specify one
+DEFAULT_PLANNED_PRODUCTS = [
+    {
+        "plannable_product_code": "TRUEVIEW_IN_STREAM",
+        "budget_micros": 1000000000000
+    },
+    {
+        "plannable_product_code": "NON_SKIP_AUCTION",
+        "budget_micros": 1000000000000
+    }
+]
+
+
+@cache
+def _google_ads_client_class():
+    """Import the Google Ads SDK on first use and record how long it took."""
+    started = time.perf_counter()
+    module = importlib.import_module("google.ads.googleads.client")
+    metrics.set_gauge(
+        "google_ads_sdk_import_seconds",
+        time.perf_counter() - started,
+        "Time spent importing the Google Ads SDK",
+    )
+    return module.GoogleAdsClient
+
+
+def forecast_location_ids(request_params: dict) -> list[str]:
+    """Return the plannable location IDs targeted by a forecast request."""
+    return request_params.get("plannable_location_ids") or [request_params["plannable_location_id"]]
+
+
+def is_google_ads_exception(ex: Exception) -> bool:
+    """
+    Whether an exception is a GoogleAdsException.
+
+    The SDK can only raise one after it has been imported, so the check never
+    triggers the import itself.
+    """
+    errors = sys.modules.get("google.ads.googleads.errors")
+    return errors is not None and isinstance(ex, errors.GoogleAdsException)
+
+
+def google_ads_error_message(ex: Exception) -> str:
+    """Extract a readable message from a GoogleAdsException."""
+    if hasattr(ex, 'error') and hasattr(ex.error, 'message'):
+        return ex.error.message
+    if hasattr(ex, 'failure') and ex.failure.errors:
+        return ex.failure.errors[0].message
+    return str(ex)
+
 
 class GoogleAdsService:
     def __init__(self):
         self.client = None
-        # Only initialize client if all required credentials are provided
-        if self._has_required_credentials():
-            self._initialize_client()
-        else:
-            logger.warning("Google Ads credentials not found. Client will be initialized when credentials are available.")
+        self.reach_curve_cache = ReachCurveCache(
+            settings.forecast_cache_ttl_seconds,
+            settings.forecast_cache_max_entries,
+        )
+        self.products_cache = create_cache(
+            "plannable_products",
+            settings.products_cache_ttl_seconds,
+            settings.products_cache_max_entries,
+        )
+        self.customers_cache = create_cache(
+            "customers",
+            settings.customers_cache_ttl_seconds,
+            settings.customers_cache_max_entries,
+        )
+        self.circuit_breakers = {
+            rpc_name: CircuitBreaker(
+                rpc_name,
+                failure_threshold=settings.circuit_breaker_failure_threshold,
+                reset_timeout_seconds=settings.circuit_breaker_reset_timeout_seconds,
+                half_open_max_calls=settings.circuit_breaker_half_open_max_calls,
+                enabled=settings.circuit_breaker_enabled,
+            )
+            for rpc_name in UPSTREAM_RPCS
+        }
+        self.hedgers = {}
+        if settings.hedging_enabled:
+            executor = ThreadPoolExecutor(
+                max_workers=settings.hedging_max_workers, thread_name_prefix="hedge"
+            )
+            budget = HedgeBudget(settings.hedging_budget_ratio)
+            self.hedgers = {
+                rpc_name: Hedger(
+                    rpc_name,
+                    executor,
+                    budget,
+                    percentile=settings.hedging_percentile,
+                    min_delay_seconds=settings.hedging_min_delay_ms / 1000,
+                    default_delay_seconds=settings.hedging_default_delay_ms / 1000,
+                    min_samples=settings.hedging_min_samples,
+                    window_size=settings.hedging_window_size,
+                )
+                for rpc_name in HEDGED_RPCS
+            }
+        # The client (and the SDK) is loaded on first use or by warm_up()
+        self._service_clients = {}
     
     def _has_required_credentials(self):
         """Check if all required credentials are available."""
@@ -46,29 +201,198 @@ class GoogleAdsService:
             if settings.google_ads_login_customer_id:
                 credentials["login_customer_id"] = settings.google_ads_login_customer_id
             
-            self.client = GoogleAdsClient.load_from_dict(credentials)
+            self.client = _google_ads_client_class().load_from_dict(credentials)
             logger.info("Google Ads client initialized successfully")
             
         except Exception as e:
             logger.error(f"Failed to initialize Google Ads client: {str(e)}")
             raise
     
+    def warm_up(self):
+        """
+        Load the Google Ads SDK and the service modules this service calls.
+        
+        Intended to run from the application startup hook so that the first
+        request does not pay for SDK imports, client creation or gRPC channel setup.
+        Without credentials only the SDK itself is imported.
+        """
+        started = time.perf_counter()
+        _google_ads_client_class()
+        if not self._has_required_credentials():
+            logger.warning("Google Ads credentials not found. Client will be initialized when credentials are available.")
+            return
+        
+        if not self.client:
+            self._initialize_client()
+        for name in USED_SERVICES:
+            self._get_service(name)
+        for name in USED_TYPES:
+            self.client.get_type(name)
+        
+        metrics.set_gauge(
+            "google_ads_warm_up_seconds",
+            time.perf_counter() - started,
+            "Time spent warming up the Google Ads client",
+        )
+        logger.info(f"Google Ads client warmed up in {time.perf_counter() - started:.2f} seconds")
+    
+    def _get_service(self, name: str):
+        """
+        Get a service client, reusing the one created for the current client.
+        
+        ``GoogleAdsClient.get_service`` opens a new gRPC channel on every call.
+        """
+        cached = self._service_clients.get(name)
+        if cached is not None and cached[0] is self.client:
+            return cached[1]
+        service = self.client.get_service(name)
+        self._service_clients[name] = (self.client, service)
+        return service
+    
+    def _response_view(self, response):
+        """Return the response as a raw protobuf message when raw-proto shaping is enabled."""
+        if settings.google_ads_raw_proto_responses:
+            return to_raw_proto(response)
+        return response
+
+    def _iter_search_rows(self, response):
+        """
+        Iterate over the rows of a Search response.
+
+        In raw-proto mode the pager is consumed page by page so that rows are
+        read from the raw protobuf pages rather than wrapped one at a time.
+        """
+        if settings.google_ads_raw_proto_responses and hasattr(response, "pages"):
+            for page in response.pages:
+                yield from to_raw_proto(page).results
+        else:
+            yield from response
+
+    def _call_rpc(self, rpc_name: str, method, customer_id: str | None = None, **kwargs):
+        """
+        Make an upstream RPC through its circuit breaker, hedging it when enabled.
+        
+        The call, and the hedge if one is issued, is accounted to the current
+        caller and ``customer_id``.
+        
+        Raises:
+            CircuitOpenError: If the circuit for the RPC is open
+        """
+        breaker = self.circuit_breakers[rpc_name]
+        breaker.before_call()
+        hedger = self.hedgers.get(rpc_name)
+        started = time.perf_counter()
+        try:
+            with section_timers.time(f"rpc.{rpc_name}"):
+                if hedger:
+                    result = hedger.call(
+                        method,
+                        on_hedge=lambda: usage_tracker.record(customer_id, upstream_calls=1),
+                        **kwargs
+                    )
+                else:
+                    result = method(**kwargs)
+        except Exception as ex:
+            usage_tracker.record_upstream_call(customer_id, time.perf_counter() - started, failed=True)
+            if self._is_upstream_failure(ex):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        usage_tracker.record_upstream_call(customer_id, time.perf_counter() - started, failed=False)
+        breaker.record_success()
+        return result
+
+    @staticmethod
+    def _is_upstream_failure(ex: Exception) -> bool:
+        """Whether an error means the API is unhealthy rather than the request invalid."""
+        if is_google_ads_exception(ex) and hasattr(ex.error, 'code'):
+            return ex.error.code().name in UPSTREAM_FAILURE_CODES
+        return True
+
+    def circuit_breaker_states(self):
+        """Return the state of every upstream RPC circuit breaker."""
+        return [breaker.snapshot() for breaker in self.circuit_breakers.values()]
+
+    def hedging_stats(self):
+        """Return call and hedge counts for every hedged RPC."""
+        return [hedger.snapshot() for hedger in self.hedgers.values()]
+
     def get_reach_plan_service(self):
         """Get the Reach Plan Service from Google Ads API."""
         if not self.client:
             raise Exception("Google Ads client not initialized")
-        return self.client.get_service("ReachPlanService")
+        return self._get_service("ReachPlanService")
     
-    def list_plannable_products(self, plannable_location_id: str):
+    def list_plannable_locations(self):
+        """
+        List all plannable locations.
+        
+        The catalog is large and changes rarely; callers are expected to keep
+        their own copy (see ``app.services.location_index``) rather than call
+        this per request.
+        
+        Returns:
+            List of plannable locations with ``parent_country_id`` None for countries
+        """
+        if not self.client:
+            if not self._has_required_credentials():
+                raise Exception("Google Ads API credentials are not configured. Please check your environment variables.")
+            else:
+                self._initialize_client()
+        
+        try:
+            reach_plan_service = self.get_reach_plan_service()
+            request = self.client.get_type("ListPlannableLocationsRequest")
+            
+            response = self._call_rpc(
+                "ListPlannableLocations", reach_plan_service.list_plannable_locations, request=request
+            )
+            
+            response = self._response_view(response)
+            locations = extract_fields(response.plannable_locations, PLANNABLE_LOCATION_FIELDS)
+            for location in locations:
+                location["id"] = str(location["id"])
+                # Countries have no parent; proto3 reports the unset ID as 0
+                location["parent_country_id"] = str(location["parent_country_id"] or "") or None
+            
+            logger.info(f"Retrieved {len(locations)} plannable locations")
+            return locations
+            
+        except Exception as ex:
+            if not is_google_ads_exception(ex):
+                logger.error(f"Error retrieving plannable locations: {str(ex)}")
+                raise
+            logger.error(f"Google Ads API error: {ex}")
+            raise Exception(f"Google Ads API error: {google_ads_error_message(ex)}")
+
+    def cached_plannable_products(self, plannable_location_id: str):
+        """Return the cached plannable products of a location, or None."""
+        cached = self.products_cache.get(plannable_location_id)
+        if cached is None:
+            return None
+        usage_tracker.record(cache_hits=1)
+        return [dict(product) for product in cached]
+
+    def list_plannable_products(self, plannable_location_id: str, force_refresh: bool = False,
+                                cache_ttl_seconds: float | None = None):
         """
         List plannable products for a given location.
         
         Args:
             plannable_location_id (str): The plannable location ID
+            force_refresh (bool): Bypass the products cache and fetch from the API
+            cache_ttl_seconds (float): How long the result stays cached, instead of
+                PRODUCTS_CACHE_TTL_SECONDS
             
         Returns:
             List of plannable products
         """
+        if not force_refresh:
+            cached = self.cached_plannable_products(plannable_location_id)
+            if cached is not None:
+                return cached
+        
         if not self.client:
             if not self._has_required_credentials():
                 raise Exception("Google Ads API credentials are not configured. Please check your environment variables.")
@@ -84,32 +408,35 @@ class GoogleAdsService:
             request.plannable_location_id = plannable_location_id
             
             # Make the API call
-            response = reach_plan_service.list_plannable_products(request=request)
+            response = self._call_rpc(
+                "ListPlannableProducts", reach_plan_service.list_plannable_products, request=request
+            )
             
             # Format the response
-            products = []
-            for product in response.product_metadata:
-                products.append({
-                    "name": product.plannable_product_name,
-                    "code": product.plannable_product_code
-                })
+            with section_timers.time("list_plannable_products.shape_response"):
+                response = self._response_view(response)
+                products = extract_fields(response.product_metadata, PLANNABLE_PRODUCT_FIELDS)
+            self.products_cache.set(
+                plannable_location_id, [dict(product) for product in products], cache_ttl_seconds
+            )
             
             logger.info(f"Retrieved {len(products)} plannable products for location {plannable_location_id}")
             return products
             
-        except GoogleAdsException as ex:
+        except Exception as ex:
+            if not is_google_ads_exception(ex):
+                logger.error(f"Error retrieving plannable products: {str(ex)}")
+                raise
             logger.error(f"Google Ads API error: {ex}")
-            # Handle different types of GoogleAdsException
-            if hasattr(ex, 'error') and hasattr(ex.error, 'message'):
-                error_message = ex.error.message
-            elif hasattr(ex, 'failure') and ex.failure.errors:
-                error_message = ex.failure.errors[0].message
-            else:
-                error_message = str(ex)
-            raise Exception(f"Google Ads API error: {error_message}")
-        except Exception as e:
-            logger.error(f"Error retrieving plannable products: {str(e)}")
-            raise
+            raise Exception(f"Google Ads API error: {google_ads_error_message(ex)}")
+
+    def cached_customers(self, customer_id: str):
+        """Return the cached customer clients of a customer, or None."""
+        cached = self.customers_cache.get(customer_id)
+        if cached is None:
+            return None
+        usage_tracker.record(customer_id, cache_hits=1)
+        return [dict(customer) for customer in cached]
 
     def search_customers(self, customer_id: str):
         """
@@ -121,6 +448,10 @@ class GoogleAdsService:
         Returns:
             List of customer clients
         """
+        cached = self.cached_customers(customer_id)
+        if cached is not None:
+            return cached
+        
         if not self.client:
             if not self._has_required_credentials():
                 raise Exception("Google Ads API credentials are not configured. Please check your environment variables.")
@@ -129,7 +460,7 @@ class GoogleAdsService:
                 self._initialize_client()
 
         try:
-            google_ads_service = self.client.get_service("GoogleAdsService")
+            google_ads_service = self._get_service("GoogleAdsService")
             
             # GAQL query to get customer clients
             query = """
@@ -147,44 +478,109 @@ class GoogleAdsService:
             search_request.customer_id = customer_id
             search_request.query = query
             
-            response = google_ads_service.search(request=search_request)
+            response = self._call_rpc(
+                "Search", google_ads_service.search, customer_id=customer_id, request=search_request
+            )
             
-            # Format the response
-            customers = []
-            for row in response:
-                customer_client = row.customer_client
-                customers.append({
-                    "id": str(customer_client.id),
-                    "name": customer_client.descriptive_name or f"Customer {customer_client.id}"
-                })
+            # Format the response (later result pages are fetched while iterating)
+            with section_timers.time("search_customers.shape_response"):
+                customers = extract_fields(self._iter_search_rows(response), CUSTOMER_CLIENT_FIELDS)
+            for customer in customers:
+                customer["name"] = customer["name"] or f"Customer {customer['id']}"
+                customer["id"] = str(customer["id"])
+            self.customers_cache.set(customer_id, [dict(customer) for customer in customers])
             
             logger.info(f"Retrieved {len(customers)} customers for customer ID {customer_id}")
             return customers
             
-        except GoogleAdsException as ex:
+        except Exception as ex:
+            if not is_google_ads_exception(ex):
+                logger.error(f"Error searching customers: {str(ex)}")
+                raise
             logger.error(f"Google Ads API error: {ex}")
-            # Handle different types of GoogleAdsException
-            if hasattr(ex, 'error') and hasattr(ex.error, 'message'):
-                error_message = ex.error.message
-            elif hasattr(ex, 'failure') and ex.failure.errors:
-                error_message = ex.failure.errors[0].message
-            else:
-                error_message = str(ex)
-            raise Exception(f"Google Ads API error: {error_message}")
-        except Exception as e:
-            logger.error(f"Error searching customers: {str(e)}")
-            raise
+            raise Exception(f"Google Ads API error: {google_ads_error_message(ex)}")
+
+    def _build_forecast_request(self, request_params: dict, planned_products: list[dict]):
+        """Build a GenerateReachForecastRequest from the request parameters."""
+        request = self.client.get_type("GenerateReachForecastRequest")
+        request.customer_id = request_params["customer_id"]
+        
+        # Set campaign duration using dateRange with DateRange object
+        campaign_duration = self.client.get_type("CampaignDuration")
+        date_range = self.client.get_type("DateRange")
+        date_range.start_date = request_params["start_date"]
+        date_range.end_date = request_params["end_date"]
+        campaign_duration.date_range = date_range
+        request.campaign_duration = campaign_duration
+        
+        # Set currency code
+        request.currency_code = request_params["currency_code"]
+        
+        # Set targeting
+        # Set plannable location IDs
+        for location_id in forecast_location_ids(request_params):
+            request.targeting.plannable_location_ids.append(location_id)
+        
+        # Set network
+        request.targeting.network = self.client.enums.ReachPlanNetworkEnum[request_params["network"]]
+        
+        # Set audience targeting with user lists
+        if request_params.get("user_list_id"):
+            user_list_info = self.client.get_type("UserListInfo")
+            user_list_info.user_list = f"customers/{request_params['customer_id']}/userLists/{request_params['user_list_id']}"
+            request.targeting.audience_targeting.user_lists.append(user_list_info)
+        
+        # Set planned products
+        for product_data in planned_products:
+            planned_product = self.client.get_type("PlannedProduct")
+            planned_product.plannable_product_code = product_data["plannable_product_code"]
+            planned_product.budget_micros = product_data["budget_micros"]
+            request.planned_products.append(planned_product)
+        
+        return request
+
+    def cached_reach_forecast(self, request_params: dict):
+        """Return the forecast for ``request_params`` from the reach curve cache, or None."""
+        if not settings.forecast_cache_enabled:
+            return None
+        planned_products = request_params.get("planned_products") or DEFAULT_PLANNED_PRODUCTS
+        cached = self.reach_curve_cache.lookup(request_params, planned_products)
+        if cached is None:
+            return None
+        usage_tracker.record(request_params["customer_id"], cache_hits=1)
+        return {
+            **cached,
+            "currency_code": request_params["currency_code"],
+            "customer_id": request_params["customer_id"]
+        }
 
-    def generate_reach_forecast(self, request_params: dict):
+    def generate_reach_forecast(self, request_params: dict, force_refresh: bool = False,
+                                cache_ttl_seconds: float | None = None):
         """
         Generate reach forecast using Google Ads API with exponential backoff for timeout errors.
         
+        Forecasts are answered from the reach curve cache when a stored curve
+        for the same targeting and product mix covers the requested budget.
+        
         Args:
-            request_params: Dictionary containing request parameters including start_date and end_date
+            request_params: Dictionary containing request parameters including start_date and end_date,
+                and optionally ``planned_products`` (defaults to DEFAULT_PLANNED_PRODUCTS).
+                ``plannable_location_ids`` may replace ``plannable_location_id`` to target
+                several locations in one forecast
+            force_refresh: Bypass the reach curve cache and fetch from the API
+            cache_ttl_seconds: How long the reach curve stays cached, instead of
+                FORECAST_CACHE_TTL_SECONDS
             
         Returns:
             Dictionary containing reach forecast data
         """
+        planned_products = request_params.get("planned_products") or DEFAULT_PLANNED_PRODUCTS
+        
+        if not force_refresh:
+            cached = self.cached_reach_forecast(request_params)
+            if cached is not None:
+                return cached
+        
         if not self._has_required_credentials():
             raise Exception("Google Ads credentials not configured")
         
@@ -197,74 +593,29 @@ class GoogleAdsService:
         for attempt in range(max_attempts):
             try:
                 # Get the reach plan service
-                reach_plan_service = self.client.get_service("ReachPlanService")
-                
-                # Create the request
-                request = self.client.get_type("GenerateReachForecastRequest")
-                request.customer_id = request_params["customer_id"]
-                
-                # Set campaign duration using dateRange with DateRange object
-                campaign_duration = self.client.get_type("CampaignDuration")
-                date_range = self.client.get_type("DateRange")
-                date_range.start_date = request_params["start_date"]
-                date_range.end_date = request_params["end_date"]
-                campaign_duration.date_range = date_range
-                request.campaign_duration = campaign_duration
-                
-                # Set currency code
-                request.currency_code = request_params["currency_code"]
+                reach_plan_service = self._get_service("ReachPlanService")
                 
-                # Set targeting
-                # Set plannable location IDs
-                request.targeting.plannable_location_ids.append(request_params["plannable_location_id"])
-                
-                # Set network
-                request.targeting.network = self.client.enums.ReachPlanNetworkEnum[request_params["network"]]
-                
-                # Set audience targeting with user lists
-                if request_params.get("user_list_id"):
-                    user_list_info = self.client.get_type("UserListInfo")
-                    user_list_info.user_list = f"customers/{request_params['customer_id']}/userLists/{request_params['user_list_id']}"
-                    request.targeting.audience_targeting.user_lists.append(user_list_info)
-                
-                # Set planned products
-                planned_products = [
-                    {
-                        "plannable_product_code": "TRUEVIEW_IN_STREAM",
-                        "budget_micros": 1000000000000
-                    },
-                    {
-                        "plannable_product_code": "NON_SKIP_AUCTION", 
-                        "budget_micros": 1000000000000
-                    }
-                ]
-                
-                for product_data in planned_products:
-                    planned_product = self.client.get_type("PlannedProduct")
-                    planned_product.plannable_product_code = product_data["plannable_product_code"]
-                    planned_product.budget_micros = product_data["budget_micros"]
-                    request.planned_products.append(planned_product)
+                with section_timers.time("generate_reach_forecast.build_request"):
+                    request = self._build_forecast_request(request_params, planned_products)
                 
                 # Make the API call
                 logger.info(f"Generating reach forecast for customer {request_params['customer_id']} (attempt {attempt + 1})")
-                response = reach_plan_service.generate_reach_forecast(request=request)
+                response = self._call_rpc(
+                    "GenerateReachForecast",
+                    reach_plan_service.generate_reach_forecast,
+                    customer_id=request_params["customer_id"],
+                    request=request
+                )
                 
                 # Process the response
-                reach_curve_points = []
-                for point in response.reach_curve.reach_forecasts:
-                    reach_curve_points.append({
-                        "cost_micros": point.cost_micros,
-                        "reach": point.forecast_metrics.reach,
-                        "impressions": point.forecast_metrics.impressions,
-                        "frequency": point.forecast_metrics.frequency
-                    })
-                
-                processed_planned_products = []
-                for product in response.planned_products:
-                    processed_planned_products.append({
-                        "plannable_product_code": product.plannable_product_code,
-                        "budget_micros": product.budget_micros
-                    })
+                with section_timers.time("generate_reach_forecast.shape_response"):
+                    response = self._response_view(response)
+                    reach_curve_points = extract_fields(
+                        response.reach_curve.reach_forecasts, REACH_CURVE_POINT_FIELDS
+                    )
+                    processed_planned_products = extract_fields(
+                        response.planned_products, PLANNED_PRODUCT_FIELDS
+                    )
                 
                 result = {
                     "reach_curve": reach_curve_points,
@@ -273,9 +624,16 @@ class GoogleAdsService:
                     "customer_id": request_params["customer_id"]
                 }
                 
+                if settings.forecast_cache_enabled:
+                    self.reach_curve_cache.store(
+                        request_params, planned_products, reach_curve_points, cache_ttl_seconds
+                    )
+                
                 logger.info(f"Successfully generated reach forecast with {len(reach_curve_points)} curve points")
                 return result
                 
+            except CircuitOpenError:
+                raise
             except Exception as ex:
                 # Check if it's a timeout or retryable error
                 is_timeout = "timeout" in str(ex).lower() or "deadline" in str(ex).lower()
@@ -285,20 +643,14 @@ class GoogleAdsService:
                     # Calculate exponential backoff delay with jitter
                     delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
                     logger.warning(f"Timeout error on attempt {attempt + 1}, retrying in {delay:.2f} seconds: {str(ex)}")
+                    usage_tracker.record(request_params["customer_id"], retries=1)
                     time.sleep(delay)
                     continue
                 else:
                     # Handle non-timeout errors or final attempt
-                    if isinstance(ex, GoogleAdsException):
+                    if is_google_ads_exception(ex):
                         logger.error(f"Google Ads API error: {ex}")
-                        # Handle different types of GoogleAdsException
-                        if hasattr(ex, 'error') and hasattr(ex.error, 'message'):
-                            error_message = ex.error.message
-                        elif hasattr(ex, 'failure') and ex.failure.errors:
-                            error_message = ex.failure.errors[0].message
-                        else:
-                            error_message = str(ex)
-                        raise Exception(f"Google Ads API error: {error_message}") from ex
+                        raise Exception(f"Google Ads API error: {google_ads_error_message(ex)}") from ex
                     else:
                         logger.error(f"Error generating reach forecast: {str(ex)}")
                         raise Exception(f"Error generating reach forecast: {str(ex)}") from ex
@@ -0,0 +1,154 @@
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import contextvars
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Rolling window of call latencies used to pick the hedging delay."""
+
+    def __init__(self, window_size: int):
+        self._samples: deque[float] = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percentile: float, min_samples: int) -> float | None:
+        """Return the latency percentile, or None with fewer than ``min_samples`` samples."""
+        with self._lock:
+            if len(self._samples) < max(min_samples, 1):
+                return None
+            ordered = sorted(self._samples)
+        index = min(int(len(ordered) * percentile / 100), len(ordered) - 1)
+        return ordered[index]
+
+
+class HedgeBudget:
+    """
+    Token bucket limiting hedges to a fraction of primary calls.
+
+    Every primary call adds ``ratio`` tokens (up to ``max_tokens``) and every
+    hedge spends one, so hedges never exceed roughly ``ratio`` of the calls.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class Hedger:
+    """
+    Issues a second, identical call when the first is slower than usual.
+
+    If the primary call has not returned after the configured latency
+    percentile of recent calls, and the hedge budget allows it, the same call
+    is issued again and the first successful response wins. The losing call is
+    cancelled if it has not started yet and its result is discarded otherwise.
+    Only use this for idempotent reads.
+
+    Args:
+        name: Name used in logs and metrics
+        executor: Thread pool running the calls
+        budget: Hedge budget shared by the hedged RPCs
+        percentile: Latency percentile after which a hedge is issued
+        min_delay_seconds: Lower bound for the hedging delay
+        default_delay_seconds: Delay used until enough latencies are recorded
+        min_samples: Number of latencies needed before using the percentile
+        window_size: Number of recent latencies kept
+    """
+
+    def __init__(self, name: str, executor: ThreadPoolExecutor, budget: HedgeBudget,
+                 percentile: float, min_delay_seconds: float, default_delay_seconds: float,
+                 min_samples: int, window_size: int):
+        self.name = name
+        self.executor = executor
+        self.budget = budget
+        self.percentile = percentile
+        self.min_delay_seconds = min_delay_seconds
+        self.default_delay_seconds = default_delay_seconds
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker(window_size)
+        self.calls = 0
+        self.hedges_issued = 0
+        self.hedges_won = 0
+
+    def hedge_delay(self) -> float:
+        observed = self.latencies.percentile(self.percentile, self.min_samples)
+        if observed is None:
+            return self.default_delay_seconds
+        return max(observed, self.min_delay_seconds)
+
+    def _submit(self, method, kwargs) -> Future:
+        # Run with the caller's context so request-scoped state follows the call
+        context = contextvars.copy_context()
+        return self.executor.submit(context.run, method, **kwargs)
+
+    def call(self, method, on_hedge: Callable[[], None] | None = None, **kwargs):
+        """
+        Call ``method(**kwargs)``, hedging it when it is slow.
+
+        Args:
+            method: Idempotent call to make
+            on_hedge: Called in the calling thread when a hedge is issued, e.g.
+                to account for the extra upstream call
+        """
+        started = time.monotonic()
+        self.calls += 1
+        self.budget.deposit()
+
+        primary = self._submit(method, kwargs)
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done or not self.budget.try_spend():
+            result = primary.result()
+            self.latencies.record(time.monotonic() - started)
+            return result
+
+        self.hedges_issued += 1
+        if on_hedge is not None:
+            on_hedge()
+        logger.info(f"Hedging slow {self.name} call after {time.monotonic() - started:.2f} seconds")
+        hedge = self._submit(method, kwargs)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                if future is hedge:
+                    self.hedges_won += 1
+                self.latencies.record(time.monotonic() - started)
+                return future.result()
+        raise error
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "hedges_issued": self.hedges_issued,
+            "hedges_won": self.hedges_won,
+            "hedge_delay_seconds": self.hedge_delay(),
+        }
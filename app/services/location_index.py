@@ -0,0 +1,208 @@
+import bisect
+import logging
+import threading
+import time
+
+from app.config import settings
+from app.services.google_ads_client import google_ads_service
+from app.services.usage import current_caller
+
+logger = logging.getLogger(__name__)
+
+# Caller the background catalog refreshes are accounted to
+LOCATION_CATALOG_CALLER = "system:location-catalog"
+
+
+def _name_keys(name: str) -> list[str]:
+    """Return the case-folded name from the start of every word, e.g. "new york", "york"."""
+    folded = name.casefold()
+    return [
+        folded[i:] for i, char in enumerate(folded)
+        if char.isalnum() and (i == 0 or not folded[i - 1].isalnum())
+    ]
+
+
+class LocationIndex:
+    """
+    Immutable search index over the plannable locations catalog.
+
+    Names are indexed from the start of every word in a sorted list, so a
+    prefix lookup ("york", "new y") is a binary search followed by a scan of
+    the matching range. Location IDs are searchable by prefix the same way.
+    """
+
+    def __init__(self, locations: list[dict]):
+        self._by_id = {location["id"]: location for location in locations}
+        self._ids = sorted(self._by_id)
+        name_keys = sorted(
+            (key, location["id"]) for location in locations for key in _name_keys(location["name"])
+        )
+        self._name_keys = [key for key, _ in name_keys]
+        self._name_ids = [location_id for _, location_id in name_keys]
+        self._by_parent: dict[str | None, list[str]] = {}
+        for location in sorted(locations, key=lambda location: location["name"].casefold()):
+            self._by_parent.setdefault(location["parent_country_id"], []).append(location["id"])
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, location_id: str) -> dict | None:
+        return self._by_id.get(location_id)
+
+    @staticmethod
+    def _prefix_slice(keys: list[str], prefix: str) -> slice:
+        """Return the slice of a sorted list holding the keys that start with ``prefix``."""
+        start = bisect.bisect_left(keys, prefix)
+        return slice(start, bisect.bisect_left(keys, prefix + "\U0010ffff", start))
+
+    def search(self, query: str | None = None, parent_country_id: str | None = None,
+               limit: int = 100) -> list[dict]:
+        """
+        Find locations by name or ID prefix, optionally within one country.
+
+        Without a query all locations (of the country) are returned by name.
+        Names starting with the query rank before names where a later word
+        matches.
+        """
+        query = (query or "").strip().casefold()
+        if not self._by_id:
+            return []
+
+        if not query:
+            ids = self._by_parent.get(parent_country_id, []) if parent_country_id else sorted(
+                self._by_id, key=lambda location_id: self._by_id[location_id]["name"].casefold()
+            )
+            return [self._by_id[location_id] for location_id in ids[:limit]]
+
+        matches = dict.fromkeys(self._name_ids[self._prefix_slice(self._name_keys, query)])
+        matches.update(dict.fromkeys(self._ids[self._prefix_slice(self._ids, query)]))
+        locations = [
+            self._by_id[location_id] for location_id in matches
+            if not parent_country_id or self._by_id[location_id]["parent_country_id"] == parent_country_id
+        ]
+        locations.sort(key=lambda location: (
+            location["id"] != query and not location["name"].casefold().startswith(query),
+            location["name"].casefold(),
+        ))
+        return locations[:limit]
+
+    def parent_country_ids(self, location_ids: list[str]) -> dict[str, str]:
+        """Return the parent country of every given location that has one."""
+        parents = {}
+        for location_id in location_ids:
+            location = self._by_id.get(location_id)
+            if location and location["parent_country_id"]:
+                parents[location_id] = location["parent_country_id"]
+        return parents
+
+
+class PlannableLocationCatalog:
+    """
+    Plannable locations catalog kept in memory and refreshed periodically.
+
+    The catalog is loaded on first use (or by the background refresher) and
+    replaced as a whole on refresh. Once it is loaded, lookups never call the
+    API: a stale catalog is served while it is refreshed in the background,
+    and if a refresh fails the previous catalog keeps being served.
+    """
+
+    def __init__(self, service, refresh_interval_seconds: float):
+        self.service = service
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.loaded_at: float | None = None
+        self._index: LocationIndex | None = None
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def loaded_index(self) -> LocationIndex | None:
+        """
+        Return the loaded index without blocking, or None before the first load.
+
+        A stale index is still returned. Unless the background refresher is
+        running, one refresh is started in the background.
+        """
+        index = self._index
+        if index is not None and time.time() - self.loaded_at > self.refresh_interval_seconds:
+            if not (self._thread and self._thread.is_alive()):
+                self._refresh_in_background()
+        return index
+
+    def refresh(self) -> LocationIndex:
+        locations = self.service.list_plannable_locations()
+        index = LocationIndex(locations)
+        self._index, self.loaded_at = index, time.time()
+        logger.info(f"Loaded {len(index)} plannable locations")
+        return index
+
+    def _refresh_in_background(self) -> None:
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+
+        def refresh():
+            current_caller.set(LOCATION_CATALOG_CALLER)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Refreshing plannable locations failed, serving the previous catalog: {str(e)}")
+            finally:
+                self._refresh_lock.release()
+
+        threading.Thread(target=refresh, name="location-catalog-refresh", daemon=True).start()
+
+    def get_index(self) -> LocationIndex:
+        """
+        Return the index, loading the catalog if it has never been loaded.
+
+        Raises:
+            Exception: If the catalog has never been loaded and loading fails
+        """
+        index = self.loaded_index()
+        if index is not None:
+            return index
+        with self._refresh_lock:
+            # Loaded by another thread while waiting for the lock
+            if self._index is not None:
+                return self._index
+            return self.refresh()
+
+    def parent_country_ids(self, location_ids: list[str]) -> dict[str, str]:
+        """Return known parent countries of the given locations; empty when the catalog is unavailable."""
+        try:
+            return self.get_index().parent_country_ids(location_ids)
+        except Exception as e:
+            logger.warning(f"Plannable locations catalog unavailable: {str(e)}")
+            return {}
+
+    def _run(self) -> None:
+        current_caller.set(LOCATION_CATALOG_CALLER)
+        wait_seconds = 0
+        while not self._stop_event.wait(wait_seconds):
+            try:
+                with self._refresh_lock:
+                    self.refresh()
+                wait_seconds = self.refresh_interval_seconds
+            except Exception as e:
+                logger.error(f"Refreshing plannable locations failed: {str(e)}")
+                wait_seconds = min(self.refresh_interval_seconds, 300)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="location-catalog", daemon=True)
+        self._thread.start()
+        logger.info("Plannable locations refresher started")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global instance
+location_catalog = PlannableLocationCatalog(
+    google_ads_service,
+    refresh_interval_seconds=settings.locations_refresh_interval_seconds,
+)
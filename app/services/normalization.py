@@ -0,0 +1,142 @@
+from datetime import date
+import json
+import re
+
+from app.config import settings
+
+VALID_NETWORKS = ["YOUTUBE", "YOUTUBE_AND_GOOGLE_VIDEO_PARTNERS"]
+
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+class InvalidRequestError(ValueError):
+    """Raised when request input cannot be normalized; the message is safe to return to clients."""
+
+
+def normalize_customer_id(customer_id: str) -> str:
+    """Strip whitespace and the dashes of the UI format (123-456-7890)."""
+    normalized = customer_id.strip().replace("-", "")
+    if not normalized.isdigit():
+        raise InvalidRequestError("Customer ID must be numeric")
+    return normalized
+
+
+def normalize_location_id(location_id: str | None) -> str:
+    normalized = (location_id or "").strip()
+    if not normalized:
+        raise InvalidRequestError("plannable_location_id is required and cannot be empty")
+    if not normalized.isdigit():
+        raise InvalidRequestError("Plannable location ID must be numeric")
+    return normalized
+
+
+def normalize_location_ids(location_ids: list[str]) -> list[str]:
+    """Normalize a list of location IDs, dropping duplicates but keeping their order."""
+    return list(dict.fromkeys(normalize_location_id(location_id) for location_id in location_ids))
+
+
+def normalize_network(network: str) -> str:
+    normalized = network.strip().upper()
+    if normalized not in VALID_NETWORKS:
+        raise InvalidRequestError(f"Network must be one of: {', '.join(VALID_NETWORKS)}")
+    return normalized
+
+
+def normalize_currency_code(currency_code: str) -> str:
+    normalized = currency_code.strip().upper()
+    if len(normalized) != 3 or not normalized.isalpha():
+        raise InvalidRequestError("Currency code must be 3 characters (e.g., USD, EUR)")
+    return normalized
+
+
+def normalize_user_list_id(user_list_id: str | None) -> str:
+    normalized = (user_list_id or "").strip()
+    if normalized and not normalized.isdigit():
+        raise InvalidRequestError("User list ID must be numeric")
+    return normalized
+
+
+def parse_date(value: str) -> date:
+    """Parse a strict YYYY-MM-DD date."""
+    value = value.strip()
+    if not _DATE_PATTERN.fullmatch(value):
+        raise InvalidRequestError("Date format must be YYYY-MM-DD")
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise InvalidRequestError(f"Invalid date: {value}") from None
+
+
+def normalize_date_range(start_date: str, end_date: str) -> tuple[str, str]:
+    """
+    Validate a campaign date range.
+
+    Raises:
+        InvalidRequestError: If a date is malformed, the range is reversed or
+            longer than ``settings.forecast_max_duration_days``
+    """
+    start, end = parse_date(start_date), parse_date(end_date)
+    if end < start:
+        raise InvalidRequestError("End date must not be before start date")
+    if (end - start).days + 1 > settings.forecast_max_duration_days:
+        raise InvalidRequestError(
+            f"Campaign duration cannot exceed {settings.forecast_max_duration_days} days"
+        )
+    return start.isoformat(), end.isoformat()
+
+
+def normalize_planned_products(planned_products: list[dict]) -> list[dict]:
+    """
+    Canonicalize a product mix: upper-case codes, merge duplicates, sort by code.
+
+    The order of planned products does not change the forecast, so equivalent
+    mixes get the same representation.
+    """
+    budgets: dict[str, int] = {}
+    for product in planned_products:
+        code = product["plannable_product_code"].strip().upper()
+        budget = product["budget_micros"]
+        if not code or budget <= 0:
+            raise InvalidRequestError(
+                "Planned products must have a product code and a positive budget"
+            )
+        budgets[code] = budgets.get(code, 0) + budget
+    return [
+        {"plannable_product_code": code, "budget_micros": budgets[code]} for code in sorted(budgets)
+    ]
+
+
+def normalize_forecast_params(start_date: str, end_date: str, customer_id: str, user_list_id: str,
+                              currency_code: str, network: str | None = None,
+                              plannable_location_id: str | None = None,
+                              planned_products: list[dict] | None = None) -> dict:
+    """
+    Build canonical forecast request parameters.
+
+    Equivalent requests (dashes in the customer ID, lower-case codes,
+    whitespace, product order) produce identical parameters, so they share
+    cache entries and request keys.
+
+    Raises:
+        InvalidRequestError: If any parameter is invalid
+    """
+    start_date, end_date = normalize_date_range(start_date, end_date)
+    params = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "customer_id": normalize_customer_id(customer_id),
+        "user_list_id": normalize_user_list_id(user_list_id),
+        "currency_code": normalize_currency_code(currency_code),
+    }
+    if network is not None:
+        params["network"] = normalize_network(network)
+    if plannable_location_id is not None:
+        params["plannable_location_id"] = normalize_location_id(plannable_location_id)
+    if planned_products:
+        params["planned_products"] = normalize_planned_products(planned_products)
+    return params
+
+
+def request_key(params: dict) -> str:
+    """Return a stable, hashable key for canonical request parameters."""
+    return json.dumps(params, sort_keys=True, separators=(",", ":"))
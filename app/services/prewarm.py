@@ -0,0 +1,186 @@
+from collections import Counter, deque
+from datetime import datetime
+import logging
+import threading
+import time
+
+from app.config import settings
+from app.services.google_ads_client import google_ads_service
+from app.services.normalization import request_key
+from app.services.stale_while_revalidate import forecast_revalidator, products_revalidator
+from app.services.usage import current_caller
+
+logger = logging.getLogger(__name__)
+
+# Caller the pre-warming calls are accounted to
+PREWARM_CALLER = "system:prewarm"
+
+
+def parse_hour_window(window: str) -> tuple[int, int] | None:
+    """
+    Parse an hour window such as "0-6" or "22-4".
+
+    Returns:
+        (start_hour, end_hour) tuple, or None when the window is empty
+    """
+    if not window or not window.strip():
+        return None
+    start, _, end = window.partition("-")
+    start_hour, end_hour = int(start), int(end)
+    if not (0 <= start_hour <= 23 and 0 <= end_hour <= 24):
+        raise ValueError(f"Invalid hour window: {window}")
+    return start_hour, end_hour
+
+
+def in_hour_window(hour: int, window: tuple[int, int] | None) -> bool:
+    if window is None:
+        return True
+    start_hour, end_hour = window
+    if start_hour <= end_hour:
+        return start_hour <= hour < end_hour
+    # Window wraps around midnight
+    return hour >= start_hour or hour < end_hour
+
+
+class PrewarmScheduler:
+    """
+    Background scheduler that keeps popular queries warm in the service caches.
+
+    Routers record the forecast parameters and plannable locations they serve.
+    During off-peak hours the scheduler refreshes the most frequent ones from
+    recent traffic, spending at most ``quota_per_cycle`` upstream calls per
+    cycle, so that peak-time requests are answered from cache.
+
+    Refreshed results are stored for ``cache_ttl_seconds`` rather than the
+    caches' usual TTLs, so they are still fresh when the peak comes, and are
+    written through the stale-while-revalidate stores that requests read first.
+    """
+
+    def __init__(self, service, interval_seconds: float, quota_per_cycle: int,
+                 top_forecasts: int, top_locations: int, history_size: int,
+                 history_window_seconds: float, offpeak_hours: str, cache_ttl_seconds: float,
+                 forecast_store=forecast_revalidator, products_store=products_revalidator):
+        self.service = service
+        self.interval_seconds = interval_seconds
+        self.quota_per_cycle = quota_per_cycle
+        self.top_forecasts = top_forecasts
+        self.top_locations = top_locations
+        self.history_window_seconds = history_window_seconds
+        self.offpeak_window = parse_hour_window(offpeak_hours)
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.forecast_store = forecast_store
+        self.products_store = products_store
+        self._forecast_history: deque[tuple[float, str]] = deque(maxlen=history_size)
+        self._location_history: deque[tuple[float, str]] = deque(maxlen=history_size)
+        self._forecast_params: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def record_forecast(self, request_params: dict) -> None:
+        """Record a served reach forecast request."""
+        key = request_key(request_params)
+        with self._lock:
+            self._forecast_history.append((time.time(), key))
+            self._forecast_params[key] = dict(request_params)
+        self.record_location(request_params["plannable_location_id"])
+
+    def record_location(self, plannable_location_id: str) -> None:
+        """Record a plannable location seen in traffic."""
+        with self._lock:
+            self._location_history.append((time.time(), plannable_location_id))
+
+    def _most_common(self, history: deque, limit: int) -> list[str]:
+        cutoff = time.time() - self.history_window_seconds
+        counts = Counter(key for timestamp, key in history if timestamp >= cutoff)
+        return [key for key, _ in counts.most_common(limit)]
+
+    def popular_forecasts(self) -> list[dict]:
+        with self._lock:
+            keys = self._most_common(self._forecast_history, self.top_forecasts)
+            # Drop parameters that have aged out of the history
+            live_keys = {key for _, key in self._forecast_history}
+            for key in list(self._forecast_params):
+                if key not in live_keys:
+                    del self._forecast_params[key]
+            return [self._forecast_params[key] for key in keys]
+
+    def popular_locations(self) -> list[str]:
+        with self._lock:
+            return self._most_common(self._location_history, self.top_locations)
+
+    def run_once(self) -> int:
+        """
+        Refresh popular plannable products and forecasts within the cycle quota.
+
+        Plannable products are refreshed first since they are cheap and shared
+        by every forecast for the location.
+
+        Returns:
+            Number of upstream calls made
+        """
+        calls = 0
+        for location_id in self.popular_locations():
+            if calls >= self.quota_per_cycle:
+                return calls
+            calls += 1
+            try:
+                products = self.service.list_plannable_products(
+                    location_id, force_refresh=True, cache_ttl_seconds=self.cache_ttl_seconds
+                )
+                self.products_store.store(location_id, products, self.cache_ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Pre-warming plannable products for {location_id} failed: {str(e)}")
+
+        for request_params in self.popular_forecasts():
+            if calls >= self.quota_per_cycle:
+                return calls
+            calls += 1
+            try:
+                forecast = self.service.generate_reach_forecast(
+                    request_params, force_refresh=True, cache_ttl_seconds=self.cache_ttl_seconds
+                )
+                self.forecast_store.store(request_key(request_params), forecast, self.cache_ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Pre-warming reach forecast for customer {request_params['customer_id']} failed: {str(e)}")
+
+        return calls
+
+    def _run(self) -> None:
+        current_caller.set(PREWARM_CALLER)
+        while not self._stop_event.wait(self.interval_seconds):
+            if not in_hour_window(datetime.now().hour, self.offpeak_window):
+                continue
+            try:
+                calls = self.run_once()
+                logger.info(f"Pre-warming cycle completed with {calls} upstream calls")
+            except Exception as e:
+                logger.error(f"Pre-warming cycle failed: {str(e)}")
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="prewarm-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Pre-warming scheduler started")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global instance
+prewarm_scheduler = PrewarmScheduler(
+    google_ads_service,
+    interval_seconds=settings.prewarm_interval_seconds,
+    quota_per_cycle=settings.prewarm_quota_per_cycle,
+    top_forecasts=settings.prewarm_top_forecasts,
+    top_locations=settings.prewarm_top_locations,
+    history_size=settings.prewarm_history_size,
+    history_window_seconds=settings.prewarm_history_window_seconds,
+    offpeak_hours=settings.prewarm_offpeak_hours,
+    cache_ttl_seconds=settings.prewarm_cache_ttl_seconds,
+)
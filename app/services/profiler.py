@@ -0,0 +1,111 @@
+from collections import Counter
+from contextlib import contextmanager
+import sys
+import threading
+import time
+
+from app import metrics
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}"
+
+
+def _collapse(frame, thread_name: str) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for the running process.
+
+    Every ``interval_seconds`` the stack of every other thread is read with
+    ``sys._current_frames()`` and counted, which costs little more than the
+    sampling thread itself. The result is in the collapsed-stack format read
+    by flamegraph.pl and speedscope: one ``thread;outer;...;inner count`` line
+    per distinct stack.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, duration_seconds: float, interval_seconds: float) -> str:
+        """
+        Sample all threads for ``duration_seconds`` and return the collapsed stacks.
+
+        Raises:
+            ProfilerBusy: If another profile is running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            own_ident = threading.get_ident()
+            samples: Counter[str] = Counter()
+            deadline = time.monotonic() + duration_seconds
+            while (started := time.monotonic()) < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident != own_ident:
+                        samples[_collapse(frame, names.get(ident, f"thread-{ident}"))] += 1
+                # Sample every interval_seconds, however long taking the sample took
+                time.sleep(max(interval_seconds - (time.monotonic() - started), 0))
+        finally:
+            self._lock.release()
+        return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+class SectionTimers:
+    """Cumulative call counts and wall time of named hot sections."""
+
+    def __init__(self):
+        self._totals: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def time(self, section: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                totals = self._totals.setdefault(section, [0, 0.0])
+                totals[0] += 1
+                totals[1] += elapsed
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            return [
+                {"section": section, "calls": calls, "seconds": seconds}
+                for section, (calls, seconds) in sorted(self._totals.items())
+            ]
+
+    def export_metrics(self) -> None:
+        for totals in self.snapshot():
+            metrics.set_gauge(
+                "hot_section_calls_total",
+                totals["calls"],
+                "Number of times a hot section ran",
+                section=totals["section"],
+            )
+            metrics.set_gauge(
+                "hot_section_seconds_total",
+                totals["seconds"],
+                "Wall time spent in a hot section",
+                section=totals["section"],
+            )
+
+
+# Global instances
+profiler = SamplingProfiler()
+section_timers = SectionTimers()
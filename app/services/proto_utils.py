@@ -0,0 +1,35 @@
+from operator import attrgetter
+
+
+def to_raw_proto(message):
+    """
+    Return the raw protobuf message backing a proto-plus wrapper.
+
+    proto-plus messages expose the underlying protobuf through the ``pb``
+    class method, which hands back the wrapped message without copying.
+    Raw protobuf messages (and plain Python objects) are returned unchanged.
+    """
+    pb = getattr(type(message), "pb", None)
+    if pb is None:
+        return message
+    return pb(message)
+
+
+def extract_fields(messages, fields: dict[str, str]):
+    """
+    Bulk-extract fields from a sequence of messages into dictionaries.
+
+    Args:
+        messages: Iterable of protobuf messages (raw or proto-plus)
+        fields: Mapping of output key to dotted attribute path,
+            e.g. {"reach": "forecast_metrics.reach"}
+
+    Returns:
+        List of dictionaries, one per message, keyed like ``fields``
+    """
+    keys = tuple(fields)
+    getter = attrgetter(*fields.values())
+    if len(keys) == 1:
+        key = keys[0]
+        return [{key: getter(message)} for message in messages]
+    return [dict(zip(keys, getter(message), strict=True)) for message in messages]
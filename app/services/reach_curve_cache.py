@@ -0,0 +1,133 @@
+from app.services.cache import create_cache
+import bisect
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def targeting_key(request_params: dict) -> str:
+    """Build the budget-independent part of a reach forecast cache key."""
+    return "|".join([
+        str(request_params["customer_id"]),
+        ",".join(sorted(
+            request_params.get("plannable_location_ids") or [request_params["plannable_location_id"]]
+        )),
+        str(request_params["network"]),
+        str(request_params.get("user_list_id") or ""),
+        str(request_params["start_date"]),
+        str(request_params["end_date"]),
+        str(request_params["currency_code"]),
+    ])
+
+
+def budget_split_key(planned_products: list[dict]) -> str:
+    """
+    Describe a product mix by each product's share of the total budget.
+
+    Mixes that only differ in their total budget (e.g. 50/50 at 1M and 50/50
+    at 2M) share the same reach curve and therefore the same key.
+    """
+    total = total_budget_micros(planned_products)
+    shares = {}
+    for product in planned_products:
+        code = product["plannable_product_code"]
+        shares[code] = shares.get(code, 0) + product["budget_micros"]
+    return ",".join(
+        f"{code}={shares[code] / total if total else 0:.6f}" for code in sorted(shares)
+    )
+
+
+def interpolate_curve(points: list[dict], costs: list[int], cost: float, field: str) -> float:
+    """Linearly interpolate a curve field at ``cost``; flat beyond the last point."""
+    index = bisect.bisect_left(costs, cost)
+    if index < len(costs) and costs[index] == cost:
+        return points[index][field]
+    if index == len(costs):
+        return points[-1][field]
+    lower_cost, lower_value = (0, 0) if index == 0 else (costs[index - 1], points[index - 1][field])
+    upper_cost, upper_value = costs[index], points[index][field]
+    return lower_value + (upper_value - lower_value) * (cost - lower_cost) / (upper_cost - lower_cost)
+
+
+def total_budget_micros(planned_products: list[dict]) -> int:
+    return sum(product["budget_micros"] for product in planned_products)
+
+
+class ReachCurveCache:
+    """
+    Cache of reach curves indexed by targeting and product mix, not budget.
+
+    Each ``GenerateReachForecast`` response describes reach over a range of
+    spend up to the requested budget. Curves for the same targeting and
+    product mix are merged, so the stored curve gets denser with every
+    upstream call, and later requests whose budget falls within the covered
+    range are answered from it.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self._cache = create_cache("reach_curves", ttl_seconds, max_entries)
+
+    def _key(self, request_params: dict, planned_products: list[dict]) -> str:
+        return f"{targeting_key(request_params)}#{budget_split_key(planned_products)}"
+
+    def lookup(self, request_params: dict, planned_products: list[dict]) -> dict | None:
+        """
+        Answer a forecast request from a stored curve.
+
+        Returns:
+            Dictionary with ``reach_curve`` and ``planned_products`` when the
+            stored curve covers the requested budget, otherwise None
+        """
+        entry = self._cache.get(self._key(request_params, planned_products))
+        budget = total_budget_micros(planned_products)
+        if entry is None or entry["covered_budget_micros"] < budget:
+            return None
+
+        points = entry["reach_curve"]
+        reach_curve = [dict(point) for point in points if point["cost_micros"] <= budget]
+        if not reach_curve:
+            return None
+        if reach_curve[-1]["cost_micros"] < budget < points[-1]["cost_micros"]:
+            # End the curve at the requested budget, as an upstream answer would
+            costs = [point["cost_micros"] for point in points]
+            reach = interpolate_curve(points, costs, budget, "reach")
+            impressions = interpolate_curve(points, costs, budget, "impressions")
+            reach_curve.append({
+                "cost_micros": budget,
+                "reach": int(round(reach)),
+                "impressions": int(round(impressions)),
+                "frequency": impressions / reach if reach else 0.0,
+            })
+
+        logger.info(f"Serving reach forecast from cached curve ({len(reach_curve)} points)")
+        return {
+            "reach_curve": reach_curve,
+            "planned_products": [dict(product) for product in planned_products],
+        }
+
+    def store(self, request_params: dict, planned_products: list[dict], reach_curve: list[dict],
+              ttl_seconds: float | None = None):
+        """
+        Merge an upstream reach curve into the stored curve for its targeting and mix.
+
+        The merged curve stays fresh for ``ttl_seconds`` when given, otherwise
+        for the cache's TTL.
+        """
+
+        def merge(entry: dict | None) -> dict:
+            points = {}
+            covered_budget = total_budget_micros(planned_products)
+            if entry is not None:
+                points.update((point["cost_micros"], point) for point in entry["reach_curve"])
+                covered_budget = max(covered_budget, entry["covered_budget_micros"])
+            points.update((point["cost_micros"], dict(point)) for point in reach_curve)
+            return {
+                "reach_curve": [points[cost] for cost in sorted(points)],
+                "covered_budget_micros": covered_budget,
+            }
+
+        # Read and write in one step so concurrent merges do not drop each other's points
+        self._cache.update(self._key(request_params, planned_products), merge, ttl_seconds)
+
+    def clear(self) -> None:
+        self._cache.clear()
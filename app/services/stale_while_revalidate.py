@@ -0,0 +1,191 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager
+import contextvars
+import logging
+import threading
+
+from app.config import settings
+from app.services.cache import create_cache
+
+logger = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidate:
+    """
+    Keeps the last good result per key and serves it while refreshing.
+
+    - Results younger than ``fresh_seconds`` are served directly.
+    - Older results, up to ``revalidate_seconds``, are served immediately
+      while a background refresh fetches a new one.
+    - Otherwise the result is fetched, and when fetching fails a result up
+      to ``max_stale_seconds`` old is served instead of the error.
+
+    Background refreshes run on at most ``refresh_workers`` threads, each
+    inside the ``admit`` context given by the caller (e.g. an admission slot),
+    so they are bound by the same upstream limits as requests.
+
+    Args:
+        name: Name used in log messages
+        fresh_seconds: Age below which a stored result is served as fresh
+        revalidate_seconds: Maximum age of a result served while refreshing
+        max_stale_seconds: Maximum age of a result served when fetching fails
+        max_entries: Maximum number of stored results
+        refresh_workers: Maximum number of concurrent background refreshes
+        enabled: When False, every call goes straight to ``fetch``
+    """
+
+    def __init__(self, name: str, fresh_seconds: float, revalidate_seconds: float,
+                 max_stale_seconds: float, max_entries: int, refresh_workers: int = 4,
+                 enabled: bool = True):
+        self.name = name
+        self.revalidate_seconds = revalidate_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.enabled = enabled
+        self._cache = create_cache(
+            f"stale:{name}", fresh_seconds, max_entries, retention_seconds=max_stale_seconds
+        )
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=refresh_workers, thread_name_prefix=f"revalidate-{name}"
+        )
+
+    def _serve_stored(self, key: str, entry, refresh: Callable,
+                      admit: Callable[[], AbstractContextManager] | None):
+        """Return the stored result if it may be served, refreshing it in the background when stale."""
+        age = entry.age
+        if entry.is_fresh(self._cache.ttl_seconds):
+            return entry.value, None
+        if age <= self.revalidate_seconds:
+            self._refresh_in_background(key, refresh, admit)
+            return entry.value, age
+        return None
+
+    def lookup(self, key: str, refresh: Callable, cached: Callable | None = None,
+               admit: Callable[[], AbstractContextManager] | None = None):
+        """
+        Return a result for ``key`` without fetching it synchronously.
+
+        Lets callers skip the wait for upstream capacity when a result is
+        available locally.
+
+        Args:
+            key: Key of the result
+            refresh: Function fetching a new result from the source, run in the
+                background when the stored result is stale
+            cached: Function returning the result from another cache or None,
+                tried when nothing is stored for ``key``
+            admit: Function returning the context a background refresh runs in
+
+        Returns:
+            Tuple of (value, stale_age) as returned by ``get``, or None when the
+            result has to be fetched
+        """
+        entry = self._cache.get_entry(key) if self.enabled else None
+        if entry is not None:
+            return self._serve_stored(key, entry, refresh, admit)
+        value = cached() if cached is not None else None
+        if value is None:
+            return None
+        if self.enabled:
+            self._cache.set(key, value)
+        return value, None
+
+    def get(self, key: str, fetch: Callable, refresh: Callable | None = None,
+            admit: Callable[[], AbstractContextManager] | None = None):
+        """
+        Return a result for ``key``, fetching it when no usable result is stored.
+
+        Args:
+            key: Key of the result
+            fetch: Function returning the result, possibly from a cache of its own
+            refresh: Function fetching a new result from the source, bypassing such
+                caches; used whenever a stored result is too old. Defaults to ``fetch``
+            admit: Function returning the context a background refresh runs in
+
+        Returns:
+            Tuple of (value, stale_age) where stale_age is the age in seconds
+            of a stale result, or None when the result is fresh
+        """
+        if not self.enabled:
+            return fetch(), None
+        refresh = refresh or fetch
+
+        entry = self._cache.get_entry(key)
+        if entry is not None:
+            served = self._serve_stored(key, entry, refresh, admit)
+            if served is not None:
+                return served
+
+        try:
+            # A stored result that is too old must not be replaced by an equally old cached one
+            value = fetch() if entry is None else refresh()
+        except Exception as e:
+            if entry is not None and entry.age <= self.max_stale_seconds:
+                logger.warning(f"Serving stale {self.name} for {key} after upstream failure: {str(e)}")
+                return entry.value, entry.age
+            raise
+
+        self._cache.set(key, value)
+        return value, None
+
+    def _refresh_in_background(self, key: str, fetch: Callable,
+                               admit: Callable[[], AbstractContextManager] | None) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                if admit is None:
+                    value = fetch()
+                else:
+                    with admit():
+                        value = fetch()
+                self._cache.set(key, value)
+            except Exception as e:
+                logger.warning(f"Background refresh of {self.name} for {key} failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        # Refresh in a copy of the caller's context so request-scoped state follows it
+        self._refresh_executor.submit(contextvars.copy_context().run, refresh)
+
+    def store(self, key: str, value, ttl_seconds: float | None = None) -> None:
+        """Store a result fetched elsewhere, fresh for ``ttl_seconds`` when given."""
+        if self.enabled:
+            self._cache.set(key, value, ttl_seconds)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def stale_headers(stale_age: float | None) -> dict[str, str]:
+    """Response headers marking a result served from a stale cache entry."""
+    if stale_age is None:
+        return {}
+    return {"X-Cache-Status": "STALE", "Age": str(int(stale_age))}
+
+
+# Global instances
+forecast_revalidator = StaleWhileRevalidate(
+    "reach forecast",
+    fresh_seconds=settings.stale_fresh_seconds,
+    revalidate_seconds=settings.stale_revalidate_seconds,
+    max_stale_seconds=settings.stale_max_age_seconds,
+    max_entries=settings.stale_max_entries,
+    refresh_workers=settings.stale_refresh_max_workers,
+    enabled=settings.stale_while_revalidate_enabled,
+)
+products_revalidator = StaleWhileRevalidate(
+    "plannable products",
+    fresh_seconds=settings.stale_fresh_seconds,
+    revalidate_seconds=settings.stale_revalidate_seconds,
+    max_stale_seconds=settings.stale_max_age_seconds,
+    max_entries=settings.stale_max_entries,
+    refresh_workers=settings.stale_refresh_max_workers,
+    enabled=settings.stale_while_revalidate_enabled,
+)
@@ -0,0 +1,236 @@
+from collections import Counter
+from contextvars import ContextVar
+from datetime import UTC, datetime, timedelta
+import logging
+import sqlite3
+import threading
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ANONYMOUS_CALLER = "anonymous"
+
+# Caller of the current request, set by CallerContextMiddleware
+current_caller: ContextVar[str] = ContextVar("current_caller", default=ANONYMOUS_CALLER)
+
+USAGE_COUNTERS = ("upstream_calls", "upstream_errors", "retries", "cache_hits", "upstream_seconds")
+
+# Adds counts to the stored row of a (day, caller, customer_id)
+_UPSERT_SQL = (
+    f"INSERT INTO usage (day, caller, customer_id, {', '.join(USAGE_COUNTERS)})"
+    f" VALUES (?, ?, ?{', ?' * len(USAGE_COUNTERS)})"
+    " ON CONFLICT (day, caller, customer_id) DO UPDATE SET "
+    + ", ".join(f"{counter} = {counter} + excluded.{counter}" for counter in USAGE_COUNTERS)
+)
+
+
+class UsageBudgetExceeded(Exception):
+    """Raised when a caller has used up its daily upstream call budget."""
+
+    def __init__(self, message: str, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+def usage_day(now: datetime | None = None) -> str:
+    """Return the UTC day usage is accounted to."""
+    return (now or datetime.now(UTC)).date().isoformat()
+
+
+def seconds_until_next_day(now: datetime | None = None) -> float:
+    now = now or datetime.now(UTC)
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), UTC)
+    return (tomorrow - now).total_seconds()
+
+
+class UsageTracker:
+    """
+    Per-caller and per-customer accounting of Google Ads API usage.
+
+    Counters are kept in memory per (day, caller, customer_id) and added to
+    a local SQLite store on ``flush()``, which every worker process on the
+    host writes to. Reads combine the stored totals with this worker's
+    unflushed counts. The per-caller totals seen at the last flush are used
+    to enforce the optional daily budget without touching the store on
+    every request.
+
+    Args:
+        path: Path of the SQLite database file
+        daily_budget_per_caller: Upstream calls allowed per caller and UTC day; 0 disables the budget
+        retention_days: How many days of usage are kept
+        enabled: Whether usage is recorded at all
+    """
+
+    def __init__(self, path: str, daily_budget_per_caller: int, retention_days: int,
+                 flush_interval_seconds: float, enabled: bool = True):
+        self.path = path
+        self.daily_budget_per_caller = daily_budget_per_caller
+        self.retention_days = retention_days
+        self.flush_interval_seconds = flush_interval_seconds
+        self.enabled = enabled
+        self._pending: dict[tuple[str, str, str], Counter] = {}
+        self._stored_caller_calls: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            " day TEXT NOT NULL, caller TEXT NOT NULL, customer_id TEXT NOT NULL,"
+            + "".join(f" {counter} REAL NOT NULL DEFAULT 0," for counter in USAGE_COUNTERS)
+            + " PRIMARY KEY (day, caller, customer_id))"
+        )
+        return conn
+
+    def record(self, customer_id: str | None = None, **counts: float) -> None:
+        """Add ``counts`` (e.g. ``upstream_calls=1``) for the current caller and ``customer_id``."""
+        if not self.enabled:
+            return
+        key = (usage_day(), current_caller.get(), customer_id or "-")
+        with self._lock:
+            self._pending.setdefault(key, Counter()).update(counts)
+
+    def record_upstream_call(self, customer_id: str | None, seconds: float, failed: bool) -> None:
+        self.record(
+            customer_id, upstream_calls=1, upstream_errors=1 if failed else 0, upstream_seconds=seconds
+        )
+
+    def check_budget(self, caller: str) -> None:
+        """
+        Raises:
+            UsageBudgetExceeded: If ``caller`` has no upstream calls left today
+        """
+        if not self.enabled or not self.daily_budget_per_caller:
+            return
+        day = usage_day()
+        with self._lock:
+            used = self._stored_caller_calls.get((day, caller), 0) + sum(
+                counts["upstream_calls"]
+                for (pending_day, pending_caller, _), counts in self._pending.items()
+                if pending_day == day and pending_caller == caller
+            )
+        if used >= self.daily_budget_per_caller:
+            raise UsageBudgetExceeded(
+                f"Daily Google Ads API budget of {self.daily_budget_per_caller} calls exceeded for caller {caller}",
+                seconds_until_next_day(),
+            )
+
+    def flush(self) -> None:
+        """Add the in-memory counts to the store and reload today's per-caller totals."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            try:
+                conn = self._connect()
+            except sqlite3.Error:
+                self._restore(pending)
+                raise
+            try:
+                with conn:
+                    conn.executemany(
+                        _UPSERT_SQL,
+                        [
+                            (*key, *(counts[counter] for counter in USAGE_COUNTERS))
+                            for key, counts in pending.items()
+                        ],
+                    )
+                    cutoff = (datetime.now(UTC) - timedelta(days=self.retention_days)).date()
+                    conn.execute("DELETE FROM usage WHERE day < ?", (cutoff.isoformat(),))
+                day = usage_day()
+                rows = conn.execute(
+                    "SELECT caller, SUM(upstream_calls) FROM usage WHERE day = ? GROUP BY caller", (day,)
+                ).fetchall()
+            except sqlite3.Error:
+                self._restore(pending)
+                raise
+            finally:
+                conn.close()
+            with self._lock:
+                self._stored_caller_calls = {(day, caller): calls for caller, calls in rows}
+
+    def _restore(self, pending: dict[tuple[str, str, str], Counter]) -> None:
+        # Keep counts that could not be stored for the next flush
+        with self._lock:
+            for key, counts in pending.items():
+                self._pending.setdefault(key, Counter()).update(counts)
+
+    def usage(self, day: str, caller: str | None = None, customer_id: str | None = None) -> list[dict]:
+        """
+        Return usage for a day, stored and unflushed, most upstream calls first.
+
+        Args:
+            day: UTC day in YYYY-MM-DD format
+            caller: Only return usage of this caller
+            customer_id: Only return usage for this customer
+        """
+        totals: dict[tuple[str, str], Counter] = {}
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT caller, customer_id, " + ", ".join(USAGE_COUNTERS) + " FROM usage WHERE day = ?",
+                (day,),
+            ).fetchall()
+        finally:
+            conn.close()
+        for row_caller, row_customer, *values in rows:
+            totals[(row_caller, row_customer)] = Counter(dict(zip(USAGE_COUNTERS, values, strict=True)))
+        with self._lock:
+            for (pending_day, pending_caller, pending_customer), counts in self._pending.items():
+                if pending_day == day:
+                    totals.setdefault((pending_caller, pending_customer), Counter()).update(counts)
+
+        usage = [
+            {
+                "caller": row_caller,
+                "customer_id": row_customer,
+                **{counter: counts[counter] for counter in USAGE_COUNTERS},
+            }
+            for (row_caller, row_customer), counts in totals.items()
+            if (caller is None or row_caller == caller) and (customer_id is None or row_customer == customer_id)
+        ]
+        for entry in usage:
+            for counter in USAGE_COUNTERS:
+                if counter != "upstream_seconds":
+                    entry[counter] = int(entry[counter])
+        usage.sort(key=lambda entry: (-entry["upstream_calls"], entry["caller"], entry["customer_id"]))
+        return usage
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval_seconds):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Flushing usage counters failed: {str(e)}")
+
+    def start(self) -> None:
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="usage-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the periodic flush and store the remaining counts."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.enabled:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Flushing usage counters failed: {str(e)}")
+
+
+# Global instance
+usage_tracker = UsageTracker(
+    settings.usage_db_path,
+    daily_budget_per_caller=settings.usage_daily_budget_per_caller,
+    retention_days=settings.usage_retention_days,
+    flush_interval_seconds=settings.usage_flush_interval_seconds,
+    enabled=settings.usage_tracking_enabled,
+)
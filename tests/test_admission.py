@@ -0,0 +1,161 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejected, Priority
+
+
+def make_controller(**overrides):
+    options = {
+        "max_concurrency": 1,
+        "per_customer_concurrency": 1,
+        "max_queue": 10,
+        "max_queue_per_customer": 10,
+        "queue_timeout_seconds": 5,
+        "weights": {Priority.INTERACTIVE: 4, Priority.BATCH: 1},
+    }
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+def test_interactive_request_overtakes_queued_batch():
+    controller = make_controller()
+    order = []
+
+    async def request(customer_id, priority, label, hold):
+        async with controller.admit(customer_id, priority):
+            order.append(label)
+            await hold.wait()
+
+    async def scenario():
+        release = asyncio.Event()
+        release.set()
+        first_hold = asyncio.Event()
+        tasks = [asyncio.create_task(request("111", Priority.BATCH, "batch-0", first_hold))]
+        await asyncio.sleep(0)
+        for i in range(1, 4):
+            tasks.append(asyncio.create_task(request("111", Priority.BATCH, f"batch-{i}", release)))
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request("222", Priority.INTERACTIVE, "interactive", release)))
+        await asyncio.sleep(0)
+        first_hold.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert order[:2] == ["batch-0", "interactive"]
+    assert sorted(order[2:]) == ["batch-1", "batch-2", "batch-3"]
+
+
+def test_per_customer_cap_lets_other_customers_through():
+    controller = make_controller(max_concurrency=2)
+
+    async def scenario():
+        hold = asyncio.Event()
+
+        async def busy():
+            async with controller.admit("111"):
+                await hold.wait()
+
+        blocker = asyncio.create_task(busy())
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(busy())
+        await asyncio.sleep(0)
+        async with controller.admit("222"):
+            snapshot = controller.snapshot()
+        hold.set()
+        await asyncio.gather(blocker, queued)
+        return snapshot
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["active_by_customer"] == {"111": 1, "222": 1}
+    assert snapshot["queued"] == 1
+
+
+def test_full_queue_rejects_with_retry_after():
+    controller = make_controller(max_queue_per_customer=1)
+
+    async def scenario():
+        hold = asyncio.Event()
+
+        async def busy():
+            async with controller.admit("111"):
+                await hold.wait()
+
+        tasks = [asyncio.create_task(busy()), asyncio.create_task(busy())]
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(AdmissionRejected) as exc_info:
+                async with controller.admit("111"):
+                    pass
+            return exc_info.value
+        finally:
+            hold.set()
+            await asyncio.gather(*tasks)
+
+    rejected = asyncio.run(scenario())
+    assert rejected.retry_after >= 1
+
+
+def test_requests_without_customer_are_not_capped_per_customer():
+    controller = make_controller(max_concurrency=3, per_customer_concurrency=1, max_queue_per_customer=1)
+
+    async def scenario():
+        hold = asyncio.Event()
+
+        async def busy():
+            async with controller.admit(None):
+                await hold.wait()
+
+        tasks = [asyncio.create_task(busy()) for _ in range(3)]
+        await asyncio.sleep(0)
+        snapshot = controller.snapshot()
+        hold.set()
+        await asyncio.gather(*tasks)
+        return snapshot
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["active"] == 3
+    assert snapshot["queued"] == 0
+
+
+def test_admit_from_thread_holds_a_slot_per_call():
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+
+    controller = make_controller(max_concurrency=4, per_customer_concurrency=2)
+    peak = {"active": 0}
+    lock = threading.Lock()
+
+    def call(loop):
+        with controller.admit_from_thread(loop, "111"):
+            with lock:
+                peak["active"] = max(peak["active"], controller._active)
+            time.sleep(0.02)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            futures = [loop.run_in_executor(executor, call, loop) for _ in range(6)]
+            await asyncio.gather(*futures)
+        return controller.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert peak["active"] == 2
+    assert snapshot == {"active": 0, "queued": 0, "active_by_customer": {}}
+
+
+def test_admit_from_thread_raises_rejection():
+    controller = make_controller(max_queue=0)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+
+        def call():
+            with controller.admit_from_thread(loop, "111"):
+                pass
+
+        with pytest.raises(AdmissionRejected):
+            await loop.run_in_executor(None, call)
+
+    asyncio.run(scenario())
@@ -0,0 +1,104 @@
+import pytest
+
+from app.services.admission import AdmissionRejected
+from app.services.budget_optimizer import estimate_reach, optimize_allocation, optimize_product_mix
+from app.services.circuit_breaker import CircuitOpenError
+
+BASE_PARAMS = {
+    "start_date": "2025-11-01",
+    "end_date": "2025-12-01",
+    "customer_id": "1234567890",
+    "user_list_id": "123456789",
+    "plannable_location_id": "2840",
+    "network": "YOUTUBE",
+    "currency_code": "USD",
+}
+
+
+def curve(*points):
+    return [
+        {"cost_micros": cost, "reach": reach, "impressions": reach * 2, "frequency": 2.0}
+        for cost, reach in points
+    ]
+
+
+# Concave curves: A saturates quickly, B keeps growing
+CURVES = {
+    "A": curve((250, 100), (500, 150), (1000, 170)),
+    "B": curve((500, 80), (1000, 160)),
+}
+
+
+def test_optimize_allocation_follows_marginal_reach():
+    allocation = optimize_allocation(CURVES, 1000, 4)
+    assert allocation == {"A": 500, "B": 500}
+    assert sum(allocation.values()) == 1000
+    assert estimate_reach(CURVES, allocation) == 230
+    assert estimate_reach(CURVES, {"A": 1000}) == 170
+
+
+def test_optimize_product_mix_validates_recommendation():
+    requests = []
+
+    def fetch(params):
+        requests.append(params)
+        products = params["planned_products"]
+        if len(products) == 1:
+            if products[0]["plannable_product_code"] == "C":
+                raise Exception("not plannable")
+            return {"reach_curve": CURVES[products[0]["plannable_product_code"]]}
+        return {
+            "reach_curve": curve((1000, 200)),
+            "planned_products": products,
+            "currency_code": "USD",
+            "customer_id": "1234567890",
+        }
+
+    result = optimize_product_mix(BASE_PARAMS, ["A", "B", "C"], 1000, fetch, max_parallel=3, steps=4)
+    assert result["allocation"] == [
+        {"plannable_product_code": "A", "budget_micros": 500},
+        {"plannable_product_code": "B", "budget_micros": 500},
+    ]
+    assert result["unavailable_products"] == ["C"]
+    assert result["estimated_reach"] == 230
+    assert result["expected_reach"] == 200
+    assert result["forecast_calls"] == 4
+    assert requests[-1]["planned_products"] == result["allocation"]
+
+
+def test_optimize_product_mix_keeps_recommendation_when_validation_fails():
+    def fetch(params):
+        products = params["planned_products"]
+        if len(products) > 1:
+            raise Exception("upstream unavailable")
+        return {"reach_curve": CURVES[products[0]["plannable_product_code"]]}
+
+    result = optimize_product_mix(BASE_PARAMS, ["A", "B"], 1000, fetch, max_parallel=2, steps=4)
+    assert result["allocation"] == [
+        {"plannable_product_code": "A", "budget_micros": 500},
+        {"plannable_product_code": "B", "budget_micros": 500},
+    ]
+    assert result["expected_reach"] is None
+    assert result["validated_forecast"] is None
+    assert result["validation_error"] == "upstream unavailable"
+
+
+@pytest.mark.parametrize("error", [
+    CircuitOpenError("GenerateReachForecast", retry_after=5),
+    AdmissionRejected("queue full", 5),
+])
+def test_optimize_product_mix_propagates_overload(error):
+    def failing_products(params):
+        raise error
+
+    with pytest.raises(type(error)):
+        optimize_product_mix(BASE_PARAMS, ["A", "B"], 1000, failing_products, max_parallel=2, steps=4)
+
+    def failing_validation(params):
+        products = params["planned_products"]
+        if len(products) > 1:
+            raise error
+        return {"reach_curve": CURVES[products[0]["plannable_product_code"]]}
+
+    with pytest.raises(type(error)):
+        optimize_product_mix(BASE_PARAMS, ["A", "B"], 1000, failing_validation, max_parallel=2, steps=4)
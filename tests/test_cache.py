@@ -0,0 +1,105 @@
+import pytest
+
+from app.services import cache as cache_mod
+from app.services.cache import SQLiteCache, TTLCache, create_cache
+
+
+def test_ttl_cache_expiry_and_lru_eviction(monkeypatch):
+    now = {"t": 1000.0}
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now["t"])
+
+    cache = TTLCache(ttl_seconds=10, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # Evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now["t"] += 11
+    assert cache.get("a") is None
+    assert cache.get_entry("a").value == 1
+
+
+def test_sqlite_cache_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a = SQLiteCache(path, "products", ttl_seconds=60, max_entries=10)
+    worker_b = SQLiteCache(path, "products", ttl_seconds=60, max_entries=10)
+    other = SQLiteCache(path, "customers", ttl_seconds=60, max_entries=10)
+
+    worker_a.set("2840", [{"name": "YouTube Videos", "code": "YOUTUBE_VIDEOS"}])
+    assert worker_b.get("2840") == [{"name": "YouTube Videos", "code": "YOUTUBE_VIDEOS"}]
+    assert other.get("2840") is None
+
+    worker_b.delete("2840")
+    assert worker_a.get("2840") is None
+
+
+def test_sqlite_cache_eviction(tmp_path, monkeypatch):
+    now = {"t": 1000.0}
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now["t"])
+
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), "ns", ttl_seconds=10, max_entries=2,
+                        retention_seconds=30)
+    for i, key in enumerate(["a", "b", "c"]):
+        now["t"] += i
+        cache.set(key, i)
+    cache.evict()
+    assert len(cache) == 2
+    assert cache.get("a") is None
+
+    # Stale entries are kept within the retention window
+    now["t"] += 20
+    assert cache.get("c") is None
+    assert cache.get_entry("c").value == 2
+    now["t"] += 20
+    cache.evict()
+    assert len(cache) == 0
+
+
+def test_sqlite_cache_concurrent_updates_are_not_lost(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    path = str(tmp_path / "cache.sqlite3")
+    workers = [SQLiteCache(path, "ns", ttl_seconds=60, max_entries=10) for _ in range(4)]
+
+    def add(worker, item):
+        worker.update("k", lambda items: (items or []) + [item])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for item in range(40):
+            executor.submit(add, workers[item % len(workers)], item)
+    assert sorted(workers[0].get("k")) == list(range(40))
+
+
+def test_create_cache_backend_selection(tmp_path, monkeypatch):
+    from app.config import settings
+
+    assert isinstance(create_cache("ns", 10, 10), TTLCache)
+
+    monkeypatch.setattr(settings, "cache_backend", "sqlite")
+    monkeypatch.setattr(settings, "cache_sqlite_path", str(tmp_path / "cache.sqlite3"))
+    assert isinstance(create_cache("ns", 10, 10), SQLiteCache)
+
+    monkeypatch.setattr(settings, "cache_backend", "redis")
+    with pytest.raises(ValueError):
+        create_cache("ns", 10, 10)
+
+
+def test_entry_ttl_overrides_cache_ttl(tmp_path, monkeypatch):
+    now = {"t": 1000.0}
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now["t"])
+
+    caches = [
+        TTLCache(ttl_seconds=10, max_entries=10),
+        SQLiteCache(str(tmp_path / "cache.sqlite3"), "ns", ttl_seconds=10, max_entries=10),
+    ]
+    for cache in caches:
+        cache.set("default", 1)
+        cache.set("long", 2, ttl_seconds=100)
+    now["t"] += 50
+    for cache in caches:
+        assert cache.get("default") is None
+        assert cache.get("long") == 2
+    caches[1].evict()
+    assert len(caches[1]) == 1
@@ -0,0 +1,49 @@
+import pytest
+
+from app.services import circuit_breaker as cb_mod
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+def test_opens_after_threshold_and_recovers(monkeypatch):
+    now = {"t": 1000.0}
+    monkeypatch.setattr(cb_mod.time, "monotonic", lambda: now["t"])
+
+    breaker = CircuitBreaker("Search", failure_threshold=2, reset_timeout_seconds=30)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.before_call()
+    assert exc_info.value.retry_after == 30
+
+    # After the cool-down a single trial call is let through
+    now["t"] += 30
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.snapshot()["consecutive_failures"] == 0
+
+
+def test_failed_trial_reopens(monkeypatch):
+    now = {"t": 1000.0}
+    monkeypatch.setattr(cb_mod.time, "monotonic", lambda: now["t"])
+
+    breaker = CircuitBreaker("Search", failure_threshold=1, reset_timeout_seconds=10)
+    breaker.record_failure()
+    now["t"] += 10
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_disabled_breaker_never_rejects():
+    breaker = CircuitBreaker("Search", failure_threshold=1, reset_timeout_seconds=10, enabled=False)
+    breaker.record_failure()
+    breaker.before_call()
@@ -24,4 +24,65 @@ def test_get_customers_success(client, monkeypatch):
 def test_get_customers_bad_id(client):
     resp = client.get("/api/v1/customers/abc")
     assert resp.status_code == 400
-    assert "Customer ID" in resp.json()["detail"]
\ No newline at end of file
+    assert "Customer ID" in resp.json()["detail"]
+
+def test_get_customers_circuit_open(client, monkeypatch):
+    from app.services.circuit_breaker import CircuitOpenError
+
+    def open_circuit(customer_id):
+        raise CircuitOpenError("Search", retry_after=12.3)
+
+    monkeypatch.setattr(
+        google_ads_client.google_ads_service,
+        "search_customers",
+        open_circuit,
+    )
+
+    resp = client.get("/api/v1/customers/1234567890")
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "13"
+
+
+def test_get_customers_rejected_by_admission(client, monkeypatch):
+    from app.services.admission import AdmissionRejected
+
+    def reject(customer_id):
+        raise AdmissionRejected("queue full", retry_after=4)
+
+    monkeypatch.setattr(
+        google_ads_client.google_ads_service,
+        "search_customers",
+        reject,
+    )
+
+    resp = client.get("/api/v1/customers/1234567890")
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "4"
+
+
+def test_get_customers_invalid_priority(client):
+    resp = client.get("/api/v1/customers/1234567890", headers={"X-Request-Priority": "urgent"})
+    assert resp.status_code == 400
+    assert "X-Request-Priority" in resp.json()["detail"]
+
+
+def test_cached_customers_skip_admission(client, monkeypatch):
+    from app.services.admission import AdmissionRejected, admission_controller
+
+    def reject(customer_id, priority):
+        raise AdmissionRejected("queue full", 1)
+
+    monkeypatch.setattr(admission_controller, "admit", reject)
+    monkeypatch.setattr(
+        google_ads_client.google_ads_service,
+        "cached_customers",
+        lambda customer_id: [{"id": "111", "name": "Alpha"}],
+    )
+
+    resp = client.get("/api/v1/customers/1234567890")
+    assert resp.status_code == 200
+    assert resp.json()["total_count"] == 1
+
+    monkeypatch.setattr(google_ads_client.google_ads_service, "cached_customers", lambda customer_id: None)
+    resp = client.get("/api/v1/customers/1234567890")
+    assert resp.status_code == 429
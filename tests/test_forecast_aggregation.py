@@ -0,0 +1,86 @@
+from app.services.forecast_aggregation import (
+    aggregate_forecasts,
+    plan_forecast_calls,
+    sum_reach_curves,
+)
+
+BASE_PARAMS = {
+    "start_date": "2025-11-01",
+    "end_date": "2025-12-01",
+    "customer_id": "1234567890",
+    "user_list_id": "123456789",
+    "currency_code": "USD",
+    "planned_products": [{"plannable_product_code": "TRUEVIEW_IN_STREAM", "budget_micros": 1000}],
+}
+
+
+def point(cost, reach, impressions):
+    return {"cost_micros": cost, "reach": reach, "impressions": impressions, "frequency": 0}
+
+
+def test_plan_combines_locations_sharing_a_parent_country():
+    parents = {"21137": "2840", "21138": "2840"}
+    calls = plan_forecast_calls(
+        BASE_PARAMS, ["21137", "21138", "2826", "2826"], ["YOUTUBE"],
+        include_market_curves=False, parent_country_ids=parents,
+    )
+    assert [call.plannable_location_ids for call in calls] == [["21137", "21138"], ["2826"]]
+    assert calls[0].request_params["plannable_location_ids"] == ["21137", "21138"]
+    assert calls[0].request_params["planned_products"][0]["budget_micros"] == 2000
+    assert calls[1].request_params["planned_products"][0]["budget_micros"] == 1000
+    assert "plannable_location_ids" not in calls[1].request_params
+
+    market_calls = plan_forecast_calls(
+        BASE_PARAMS, ["21137", "21138"], ["YOUTUBE", "YOUTUBE_AND_GOOGLE_VIDEO_PARTNERS"],
+        include_market_curves=True, parent_country_ids=parents,
+    )
+    assert len(market_calls) == 4
+
+
+def test_sum_reach_curves_aligns_by_budget_share():
+    curve_a = [point(500, 50, 100), point(1000, 80, 200)]
+    curve_b = [point(1000, 20, 40)]  # Interpolated from (0, 0) at half budget
+
+    aggregated = sum_reach_curves([(1000, curve_a), (1000, curve_b)])
+    assert [p["cost_micros"] for p in aggregated] == [1000, 2000]
+    assert [p["reach"] for p in aggregated] == [60, 100]
+    assert aggregated[1]["frequency"] == 2.4
+
+
+def test_aggregate_reports_failed_markets():
+    def fetch(params):
+        if params["plannable_location_id"] == "2826":
+            raise Exception("upstream unavailable")
+        return {"reach_curve": [point(1000, 10, 20)]}
+
+    result = aggregate_forecasts(
+        BASE_PARAMS, ["2840", "2826", "2124"], ["YOUTUBE"],
+        include_market_curves=True, fetch=fetch, max_parallel=3,
+    )
+    assert result["forecast_calls"] == 3
+    assert [f["error"] is None for f in result["forecasts"]] == [True, False, True]
+    aggregate = result["aggregates"][0]
+    assert aggregate["plannable_location_ids"] == ["2840", "2124"]
+    assert aggregate["missing_location_ids"] == ["2826"]
+    assert aggregate["reach_curve"][-1]["reach"] == 20
+
+
+def test_budget_is_per_market_with_and_without_market_curves():
+    def fetch(params):
+        # Linear curve up to the requested budget
+        budget = sum(product["budget_micros"] for product in params["planned_products"])
+        return {"reach_curve": [point(budget // 2, budget // 20, budget // 10), point(budget, budget // 10, budget // 5)]}
+
+    parents = {"21137": "2840", "21138": "2840", "21139": "2840"}
+    aggregates = []
+    for include_market_curves in (True, False):
+        result = aggregate_forecasts(
+            BASE_PARAMS, ["21137", "21138", "21139"], ["YOUTUBE"],
+            include_market_curves=include_market_curves, fetch=fetch, max_parallel=3,
+            parent_country_ids=parents,
+        )
+        aggregates.append(result["aggregates"][0]["reach_curve"])
+
+    assert aggregates[0] == aggregates[1]
+    assert aggregates[0][-1]["cost_micros"] == 3000
+    assert aggregates[0][-1]["reach"] == 300
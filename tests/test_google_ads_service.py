@@ -23,6 +23,8 @@ class FakeClient:
 
     def get_type(self, name):
         # Minimal objects with attributes used in the code under test
+        if name == "ListPlannableLocationsRequest":
+            return types.SimpleNamespace()
         if name == "ListPlannableProductsRequest":
             return types.SimpleNamespace(plannable_location_id=None)
         if name == "SearchGoogleAdsRequest":
@@ -98,6 +100,32 @@ def test_list_plannable_products(monkeypatch):
     assert products[1]["code"] == "YOUTUBE_SHORTS"
 
 
+def test_list_plannable_locations():
+    def location(location_id, name, parent_country_id, location_type):
+        return types.SimpleNamespace(
+            id=location_id,
+            name=name,
+            parent_country_id=parent_country_id,
+            country_code="US",
+            location_type=location_type,
+        )
+
+    class FakeReachPlanService:
+        def list_plannable_locations(self, request):
+            return types.SimpleNamespace(plannable_locations=[
+                location("2840", "United States", 0, "Country"),
+                location("21167", "New York", 2840, "State"),
+            ])
+
+    svc = GoogleAdsService()
+    svc.client = FakeClient(reach_plan_service=FakeReachPlanService())
+
+    locations = svc.list_plannable_locations()
+    assert locations[0]["parent_country_id"] is None
+    assert locations[1]["parent_country_id"] == "2840"
+    assert locations[1]["location_type"] == "State"
+
+
 def test_search_customers(monkeypatch):
     # Build fake search response iterable
     class FakeCustomerClient:
@@ -183,4 +211,253 @@ def test_generate_reach_forecast_with_retry(monkeypatch):
     result = svc.generate_reach_forecast(params)
     assert result["currency_code"] == "USD"
     assert len(result["reach_curve"]) == 1
-    assert calls["count"] == 2  # retried once after timeout
\ No newline at end of file
+    assert calls["count"] == 2  # retried once after timeout
+
+def test_generate_reach_forecast_reuses_cached_curve(monkeypatch):
+    from app import config as config_mod
+    for name in ("developer_token", "client_id", "client_secret", "refresh_token"):
+        monkeypatch.setattr(config_mod.settings, f"google_ads_{name}", "x")
+    monkeypatch.setattr(GoogleAdsService, "_initialize_client", lambda self: None)
+
+    calls = {"count": 0}
+
+    def make_point(cost, reach):
+        metrics = types.SimpleNamespace(reach=reach, impressions=reach * 2, frequency=2.0)
+        return types.SimpleNamespace(cost_micros=cost, forecast_metrics=metrics)
+
+    class FakeReachPlanService:
+        def generate_reach_forecast(self, request):
+            calls["count"] += 1
+            return types.SimpleNamespace(
+                reach_curve=types.SimpleNamespace(
+                    reach_forecasts=[make_point(1000, 10), make_point(2000, 15)]
+                ),
+                planned_products=request.planned_products,
+            )
+
+    svc = GoogleAdsService()
+    svc.client = FakeClient(reach_plan_service=FakeReachPlanService())
+
+    params = {
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-01",
+        "customer_id": "1234567890",
+        "user_list_id": "123456789",
+        "plannable_location_id": "2840",
+        "network": "YOUTUBE",
+        "currency_code": "USD",
+        "planned_products": [{"plannable_product_code": "TRUEVIEW_IN_STREAM", "budget_micros": 2000}],
+    }
+    first = svc.generate_reach_forecast(params)
+    assert len(first["reach_curve"]) == 2
+
+    smaller = {
+        **params,
+        "planned_products": [{"plannable_product_code": "TRUEVIEW_IN_STREAM", "budget_micros": 1000}],
+    }
+    second = svc.generate_reach_forecast(smaller)
+    assert calls["count"] == 1
+    assert [p["cost_micros"] for p in second["reach_curve"]] == [1000]
+    assert second["planned_products"][0]["budget_micros"] == 1000
+
+
+def test_generate_reach_forecast_records_usage(monkeypatch, tmp_path):
+    from app import config as config_mod
+    from app.services import google_ads_client
+    from app.services.usage import UsageTracker, current_caller, usage_day
+    for name in ("developer_token", "client_id", "client_secret", "refresh_token"):
+        monkeypatch.setattr(config_mod.settings, f"google_ads_{name}", "x")
+    monkeypatch.setattr(GoogleAdsService, "_initialize_client", lambda self: None)
+    monkeypatch.setattr("time.sleep", lambda s: None)
+    tracker = UsageTracker(str(tmp_path / "usage.sqlite3"), 0, 30, 60)
+    monkeypatch.setattr(google_ads_client, "usage_tracker", tracker)
+
+    calls = {"count": 0}
+
+    class FakeReachPlanService:
+        def generate_reach_forecast(self, request):
+            calls["count"] += 1
+            if calls["count"] == 1:
+                raise Exception("deadline exceeded")
+            point = types.SimpleNamespace(
+                cost_micros=1000,
+                forecast_metrics=types.SimpleNamespace(reach=10, impressions=20, frequency=2.0),
+            )
+            return types.SimpleNamespace(
+                reach_curve=types.SimpleNamespace(reach_forecasts=[point]),
+                planned_products=request.planned_products,
+            )
+
+    svc = GoogleAdsService()
+    svc.client = FakeClient(reach_plan_service=FakeReachPlanService())
+
+    params = {
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-01",
+        "customer_id": "1234567890",
+        "user_list_id": "123456789",
+        "plannable_location_id": "2840",
+        "network": "YOUTUBE",
+        "currency_code": "USD",
+        "planned_products": [{"plannable_product_code": "TRUEVIEW_IN_STREAM", "budget_micros": 1000}],
+    }
+    token = current_caller.set("planning-ui")
+    try:
+        svc.generate_reach_forecast(params)
+        svc.generate_reach_forecast(params)
+    finally:
+        current_caller.reset(token)
+
+    [usage] = tracker.usage(usage_day())
+    assert usage["caller"] == "planning-ui"
+    assert usage["customer_id"] == "1234567890"
+    assert usage["upstream_calls"] == 2
+    assert usage["upstream_errors"] == 1
+    assert usage["retries"] == 1
+    assert usage["cache_hits"] == 1
+
+
+def test_hedged_call_records_both_rpcs(monkeypatch, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+
+    from app.services import google_ads_client
+    from app.services.hedging import HedgeBudget, Hedger
+    from app.services.usage import UsageTracker, usage_day
+    tracker = UsageTracker(str(tmp_path / "usage.sqlite3"), 0, 30, 60)
+    monkeypatch.setattr(google_ads_client, "usage_tracker", tracker)
+
+    release = threading.Event()
+    calls = {"count": 0}
+
+    class FakeReachPlanService:
+        def list_plannable_products(self, request):
+            calls["count"] += 1
+            if calls["count"] == 1:
+                release.wait(2)  # The first call stalls and gets hedged
+            product = types.SimpleNamespace(
+                plannable_product_name="YouTube Videos",
+                plannable_product_code="YOUTUBE_VIDEOS",
+            )
+            return types.SimpleNamespace(product_metadata=[product])
+
+    svc = GoogleAdsService()
+    svc.client = FakeClient(reach_plan_service=FakeReachPlanService())
+    svc.hedgers = {
+        "ListPlannableProducts": Hedger(
+            "ListPlannableProducts", ThreadPoolExecutor(max_workers=2), HedgeBudget(1.0),
+            percentile=95, min_delay_seconds=0.01, default_delay_seconds=0.01,
+            min_samples=5, window_size=10,
+        )
+    }
+    try:
+        svc.list_plannable_products("2840")
+    finally:
+        release.set()
+
+    [usage] = tracker.usage(usage_day())
+    assert usage["upstream_calls"] == 2
+
+
+def test_list_plannable_products_cached():
+    calls = {"count": 0}
+
+    class FakeReachPlanService:
+        def list_plannable_products(self, request):
+            calls["count"] += 1
+            product = types.SimpleNamespace(
+                plannable_product_name="YouTube Videos",
+                plannable_product_code="YOUTUBE_VIDEOS",
+            )
+            return types.SimpleNamespace(product_metadata=[product])
+
+    svc = GoogleAdsService()
+    svc.client = FakeClient(reach_plan_service=FakeReachPlanService())
+
+    assert svc.list_plannable_products("2840") == svc.list_plannable_products("2840")
+    assert calls["count"] == 1
+
+    svc.list_plannable_products("2840", force_refresh=True)
+    assert calls["count"] == 2
+
+
+def test_stale_products_revalidate_through_api():
+    import time
+
+    from app.services.cache import CacheEntry
+    from app.services.stale_while_revalidate import StaleWhileRevalidate
+
+    calls = {"count": 0}
+
+    class FakeReachPlanService:
+        def list_plannable_products(self, request):
+            calls["count"] += 1
+            product = types.SimpleNamespace(
+                plannable_product_name=f"YouTube Videos {calls['count']}",
+                plannable_product_code="YOUTUBE_VIDEOS",
+            )
+            return types.SimpleNamespace(product_metadata=[product])
+
+    svc = GoogleAdsService()
+    svc.client = FakeClient(reach_plan_service=FakeReachPlanService())
+    swr = StaleWhileRevalidate(
+        "test", fresh_seconds=60, revalidate_seconds=300, max_stale_seconds=600, max_entries=10
+    )
+
+    def get():
+        return swr.get(
+            "2840",
+            lambda: svc.list_plannable_products("2840"),
+            lambda: svc.list_plannable_products("2840", force_refresh=True),
+        )
+
+    def age_entry(seconds):
+        entry = swr._cache.get_entry("2840")
+        swr._cache._entries["2840"] = CacheEntry(entry.value, entry.stored_at - seconds)
+
+    first, _ = get()
+    assert calls["count"] == 1
+
+    # The service cache still holds the first result; revalidation must skip it
+    age_entry(120)
+    assert get()[0] == first
+    deadline = time.time() + 2
+    while calls["count"] < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert calls["count"] == 2
+
+    deadline = time.time() + 2
+    while swr._cache.get("2840") == first and time.time() < deadline:
+        time.sleep(0.01)
+    refreshed, stale_age = get()
+    assert refreshed != first
+    assert stale_age is None
+
+    # Too old to serve: fetched synchronously, again from the API
+    age_entry(400)
+    assert get()[0] != refreshed
+    assert calls["count"] == 3
+
+
+def test_warm_up_preloads_services_once(monkeypatch):
+    from app import config as config_mod
+    from app import metrics
+    for name in ("developer_token", "client_id", "client_secret", "refresh_token"):
+        monkeypatch.setattr(config_mod.settings, f"google_ads_{name}", "x")
+
+    created = []
+
+    class CountingClient(FakeClient):
+        def get_service(self, name):
+            created.append(name)
+            return super().get_service(name)
+
+    svc = GoogleAdsService()
+    svc.client = CountingClient(reach_plan_service=object(), google_ads_service=object())
+    svc.warm_up()
+    assert sorted(created) == ["GoogleAdsService", "ReachPlanService"]
+    assert metrics.get_gauge("google_ads_sdk_import_seconds") is not None
+
+    # Service clients are reused instead of opening a new channel per request
+    svc.get_reach_plan_service()
+    assert created.count("ReachPlanService") == 1
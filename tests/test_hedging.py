@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from app.services.hedging import HedgeBudget, Hedger, LatencyTracker
+
+
+def make_hedger(budget_ratio=1.0):
+    budget = HedgeBudget(budget_ratio)
+    return Hedger(
+        "Search",
+        ThreadPoolExecutor(max_workers=4),
+        budget,
+        percentile=95,
+        min_delay_seconds=0.01,
+        default_delay_seconds=0.05,
+        min_samples=5,
+        window_size=100,
+    )
+
+
+def test_latency_percentile():
+    tracker = LatencyTracker(window_size=100)
+    assert tracker.percentile(95, min_samples=5) is None
+    for i in range(1, 101):
+        tracker.record(i / 100)
+    assert tracker.percentile(95, min_samples=5) == 0.96
+
+
+def test_budget_limits_hedge_rate():
+    budget = HedgeBudget(0.25)
+    spent = 0
+    for _ in range(20):
+        budget.deposit()
+        spent += budget.try_spend()
+    assert spent == 5
+
+
+def test_slow_call_is_hedged_and_fast_response_wins():
+    hedger = make_hedger()
+    calls = {"count": 0}
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def read(request):
+        with lock:
+            calls["count"] += 1
+            attempt = calls["count"]
+        if attempt == 1:
+            release.wait(2)  # The first call stalls
+            return "slow"
+        return "fast"
+
+    hedges = []
+    started = time.monotonic()
+    assert hedger.call(read, on_hedge=lambda: hedges.append(1), request="r") == "fast"
+    assert time.monotonic() - started < 1
+    release.set()
+    assert hedger.snapshot()["hedges_won"] == 1
+    assert hedges == [1]
+
+
+def test_fast_call_is_not_hedged():
+    hedger = make_hedger()
+    assert hedger.call(lambda request: request, request="r") == "r"
+    assert hedger.snapshot()["hedges_issued"] == 0
+
+
+def test_hedge_error_falls_back_to_other_call():
+    hedger = make_hedger()
+    calls = {"count": 0}
+    lock = threading.Lock()
+
+    def read(request):
+        with lock:
+            calls["count"] += 1
+            attempt = calls["count"]
+        if attempt == 1:
+            time.sleep(0.2)
+            return "primary"
+        raise Exception("hedge failed")
+
+    assert hedger.call(read, request="r") == "primary"
+
+    def always_fails(request):
+        time.sleep(0.1)
+        raise Exception("upstream down")
+
+    with pytest.raises(Exception, match="upstream down"):
+        hedger.call(always_fails, request="r")
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from app.services.location_index import LOCATION_CATALOG_CALLER, LocationIndex, PlannableLocationCatalog
+from app.services.usage import current_caller
+
+LOCATIONS = [
+    {"id": "2840", "name": "United States", "parent_country_id": None,
+     "country_code": "US", "location_type": "Country"},
+    {"id": "2826", "name": "United Kingdom", "parent_country_id": None,
+     "country_code": "GB", "location_type": "Country"},
+    {"id": "21167", "name": "New York", "parent_country_id": "2840",
+     "country_code": "US", "location_type": "State"},
+    {"id": "21137", "name": "California", "parent_country_id": "2840",
+     "country_code": "US", "location_type": "State"},
+    {"id": "20339", "name": "Greater London", "parent_country_id": "2826",
+     "country_code": "GB", "location_type": "Region"},
+]
+
+
+def names(locations):
+    return [location["name"] for location in locations]
+
+
+def test_search_by_name_and_id_prefix():
+    index = LocationIndex(LOCATIONS)
+    assert names(index.search("united")) == ["United Kingdom", "United States"]
+    assert names(index.search("NEW Y")) == ["New York"]
+    # Later words match too, after names starting with the query
+    assert names(index.search("london")) == ["Greater London"]
+    assert names(index.search("284")) == ["United States"]
+    assert index.search("nowhere") == []
+
+
+def test_search_filters_by_parent_country():
+    index = LocationIndex(LOCATIONS)
+    assert names(index.search(parent_country_id="2840")) == ["California", "New York"]
+    assert names(index.search("c", parent_country_id="2840")) == ["California"]
+    assert len(index.search(limit=2)) == 2
+    assert index.parent_country_ids(["21167", "2826", "unknown"]) == {"21167": "2840"}
+
+
+class FakeService:
+    def __init__(self):
+        self.calls = 0
+        self.callers = []
+        self.fail = False
+
+    def list_plannable_locations(self):
+        self.calls += 1
+        self.callers.append(current_caller.get())
+        if self.fail:
+            raise Exception("upstream unavailable")
+        return LOCATIONS
+
+
+def test_catalog_loads_once_and_keeps_serving_after_failed_refresh():
+    service = FakeService()
+    catalog = PlannableLocationCatalog(service, refresh_interval_seconds=3600)
+    assert catalog.loaded_index() is None
+
+    index = catalog.get_index()
+    assert catalog.get_index() is index
+    assert service.calls == 1
+
+    # A stale catalog is served at once and refreshed in the background
+    catalog.loaded_at -= 7200
+    service.fail = True
+    assert catalog.get_index() is index
+    deadline = time.time() + 2
+    while (service.calls < 2 or catalog._refresh_lock.locked()) and time.time() < deadline:
+        time.sleep(0.01)
+    assert service.calls == 2
+
+    service.fail = False
+    deadline = time.time() + 2
+    while catalog.loaded_index() is index and time.time() < deadline:
+        time.sleep(0.01)
+    assert catalog.get_index() is not index
+    assert service.calls == 3
+    assert service.callers[1:] == [LOCATION_CATALOG_CALLER] * 2
+
+
+def test_catalog_without_data_raises_or_returns_no_parents():
+    service = FakeService()
+    service.fail = True
+    catalog = PlannableLocationCatalog(service, refresh_interval_seconds=3600)
+    with pytest.raises(Exception, match="upstream unavailable"):
+        catalog.get_index()
+    assert catalog.parent_country_ids(["21167"]) == {}
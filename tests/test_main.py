@@ -1,4 +1,73 @@
 def test_health_endpoint(client):
     resp = client.get("/health")
     assert resp.status_code == 200
-    assert resp.json() == {"status": "healthy"}
\ No newline at end of file
+    assert resp.json() == {"status": "healthy"}
+
+def test_circuit_breaker_status_endpoint(client):
+    resp = client.get("/health/circuit-breakers")
+    assert resp.status_code == 200
+    names = {breaker["name"] for breaker in resp.json()["circuit_breakers"]}
+    assert {"ListPlannableProducts", "Search", "GenerateReachForecast"} <= names
+
+
+def test_metrics_endpoint(client):
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert "app_import_seconds" in resp.text
+    assert 'circuit_breaker_open{rpc="Search"} 0' in resp.text
+
+
+def test_admin_endpoints_require_token(client, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "admin_token", None)
+    assert client.get("/admin/hot-sections").status_code == 404
+
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    assert client.get("/admin/hot-sections").status_code == 403
+    assert client.get("/admin/hot-sections", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    headers = {"X-Admin-Token": "secret"}
+    resp = client.get("/admin/hot-sections", headers=headers)
+    assert resp.status_code == 200
+    assert "sections" in resp.json()
+
+    resp = client.get("/admin/profile", params={"seconds": 0.05, "interval_ms": 5}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+
+    resp = client.get("/admin/profile", params={"seconds": 3600}, headers=headers)
+    assert resp.status_code == 400
+    resp = client.get("/admin/profile", params={"seconds": 1, "interval_ms": 0.001}, headers=headers)
+    assert resp.status_code == 400
+
+
+def test_usage_budget_and_admin_usage(client, monkeypatch, tmp_path):
+    from app.config import settings
+    from app.services import google_ads_client
+    from app.services.usage import usage_tracker
+
+    monkeypatch.setattr(usage_tracker, "path", str(tmp_path / "usage.sqlite3"))
+    monkeypatch.setattr(usage_tracker, "daily_budget_per_caller", 1)
+    monkeypatch.setattr(usage_tracker, "_pending", {})
+
+    def fake_search(customer_id):
+        google_ads_client.usage_tracker.record_upstream_call(customer_id, 0.1, failed=False)
+        return []
+
+    monkeypatch.setattr(google_ads_client.google_ads_service, "search_customers", fake_search)
+
+    headers = {"X-Caller-Id": "team-a"}
+    assert client.get("/api/v1/customers/1234567890", headers=headers).status_code == 200
+    resp = client.get("/api/v1/customers/1234567890", headers=headers)
+    assert resp.status_code == 429
+    assert "Retry-After" in resp.headers
+    # Other callers keep their own budget
+    assert client.get("/api/v1/customers/1234567890", headers={"X-Caller-Id": "team-b"}).status_code == 200
+
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    resp = client.get("/admin/usage", headers={"X-Admin-Token": "secret"})
+    assert resp.status_code == 200
+    usage = {entry["caller"]: entry for entry in resp.json()["usage"]}
+    assert usage["team-a"]["upstream_calls"] == 1
+    assert usage["team-a"]["customer_id"] == "1234567890"
@@ -0,0 +1,64 @@
+import pytest
+
+from app.services.normalization import (
+    InvalidRequestError,
+    normalize_date_range,
+    normalize_forecast_params,
+    request_key,
+)
+
+
+def test_equivalent_requests_share_a_key():
+    a = normalize_forecast_params(
+        "2025-11-01", "2025-12-01", "123-456-7890", "123456789", "usd",
+        network="youtube", plannable_location_id=" 2840 ",
+        planned_products=[
+            {"plannable_product_code": "non_skip_auction", "budget_micros": 500},
+            {"plannable_product_code": "TRUEVIEW_IN_STREAM", "budget_micros": 500},
+        ],
+    )
+    b = normalize_forecast_params(
+        "2025-11-01", "2025-12-01", "1234567890", "123456789", "USD",
+        network="YOUTUBE", plannable_location_id="2840",
+        planned_products=[
+            {"plannable_product_code": "TRUEVIEW_IN_STREAM", "budget_micros": 500},
+            {"plannable_product_code": "NON_SKIP_AUCTION", "budget_micros": 500},
+        ],
+    )
+    assert a == b
+    assert request_key(a) == request_key(b)
+    assert a["customer_id"] == "1234567890"
+    assert a["planned_products"][0]["plannable_product_code"] == "NON_SKIP_AUCTION"
+
+
+@pytest.mark.parametrize("start_date,end_date,message", [
+    ("2025-11-1", "2025-12-01", "Date format must be YYYY-MM-DD"),
+    ("20251101", "2025-12-01", "Date format must be YYYY-MM-DD"),
+    ("2025-02-30", "2025-03-01", "Invalid date"),
+    ("2025-12-01", "2025-11-01", "End date must not be before start date"),
+    ("2025-01-01", "2026-06-01", "Campaign duration cannot exceed"),
+])
+def test_invalid_date_ranges(start_date, end_date, message):
+    with pytest.raises(InvalidRequestError, match=message):
+        normalize_date_range(start_date, end_date)
+
+
+@pytest.mark.parametrize("overrides,message", [
+    ({"customer_id": "12a4"}, "Customer ID must be numeric"),
+    ({"currency_code": "US"}, "Currency code must be 3 characters"),
+    ({"network": "TV"}, "Network must be one of"),
+    ({"plannable_location_id": " "}, "plannable_location_id is required"),
+])
+def test_invalid_parameters(overrides, message):
+    params = {
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-01",
+        "customer_id": "1234567890",
+        "user_list_id": "123456789",
+        "currency_code": "USD",
+        "network": "YOUTUBE",
+        "plannable_location_id": "2840",
+        **overrides,
+    }
+    with pytest.raises(InvalidRequestError, match=message):
+        normalize_forecast_params(**params)
@@ -0,0 +1,45 @@
+from app.services import google_ads_client
+from app.services.location_index import location_catalog
+
+
+def test_plannable_locations_search(client, monkeypatch):
+    calls = []
+
+    def fake_list():
+        calls.append(1)
+        return [
+            {"id": "2840", "name": "United States", "parent_country_id": None,
+             "country_code": "US", "location_type": "Country"},
+            {"id": "21167", "name": "New York", "parent_country_id": "2840",
+             "country_code": "US", "location_type": "State"},
+        ]
+
+    monkeypatch.setattr(google_ads_client.google_ads_service, "list_plannable_locations", fake_list)
+    monkeypatch.setattr(location_catalog, "_index", None)
+
+    resp = client.get("/api/v1/plannable-locations", params={"query": "york"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total_count"] == 1
+    assert data["locations"][0]["id"] == "21167"
+    assert data["locations"][0]["parent_country_id"] == "2840"
+
+    resp = client.get("/api/v1/plannable-locations", params={"parent_country_id": "2840"})
+    assert [location["name"] for location in resp.json()["locations"]] == ["New York"]
+    # Served from the in-memory catalog after the first load
+    assert len(calls) == 1
+
+    resp = client.get("/api/v1/plannable-locations", params={"limit": 0})
+    assert resp.status_code == 400
+
+
+def test_plannable_locations_error(client, monkeypatch):
+    def fake_list():
+        raise Exception("boom")
+
+    monkeypatch.setattr(google_ads_client.google_ads_service, "list_plannable_locations", fake_list)
+    monkeypatch.setattr(location_catalog, "_index", None)
+
+    resp = client.get("/api/v1/plannable-locations")
+    assert resp.status_code == 500
+    assert "boom" in resp.json()["detail"]
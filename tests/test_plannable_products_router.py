@@ -32,4 +32,27 @@ def test_get_plannable_products_empty_id(client):
         params={"plannable_location_id": ""},
     )
     assert resp.status_code == 400
-    assert "plannable_location_id" in resp.json()["detail"]
\ No newline at end of file
+    assert "plannable_location_id" in resp.json()["detail"]
+
+def test_cached_plannable_products_skip_admission(client, monkeypatch):
+    from app.services.admission import AdmissionRejected, admission_controller
+
+    def reject(customer_id, priority):
+        raise AdmissionRejected("queue full", 1)
+
+    monkeypatch.setattr(admission_controller, "admit", reject)
+    monkeypatch.setattr(
+        google_ads_client.google_ads_service,
+        "cached_plannable_products",
+        lambda loc_id: [{"name": "YouTube Videos", "code": "YOUTUBE_VIDEOS"}],
+    )
+
+    resp = client.get("/api/v1/plannable-products", params={"plannable_location_id": "1023191"})
+    assert resp.status_code == 200
+    assert resp.json() == [{"name": "YouTube Videos", "code": "YOUTUBE_VIDEOS"}]
+
+    monkeypatch.setattr(
+        google_ads_client.google_ads_service, "cached_plannable_products", lambda loc_id: None
+    )
+    resp = client.get("/api/v1/plannable-products", params={"plannable_location_id": "2276"})
+    assert resp.status_code == 429
@@ -0,0 +1,83 @@
+from app.services.normalization import request_key
+from app.services.prewarm import PrewarmScheduler, in_hour_window, parse_hour_window
+
+
+class FakeService:
+    def __init__(self):
+        self.calls = []
+
+    def list_plannable_products(self, plannable_location_id, force_refresh=False, cache_ttl_seconds=None):
+        self.calls.append(("products", plannable_location_id, force_refresh, cache_ttl_seconds))
+        return []
+
+    def generate_reach_forecast(self, request_params, force_refresh=False, cache_ttl_seconds=None):
+        self.calls.append(("forecast", request_params["customer_id"], force_refresh, cache_ttl_seconds))
+        return {"customer_id": request_params["customer_id"]}
+
+
+class FakeStore:
+    def __init__(self):
+        self.stored = {}
+
+    def store(self, key, value, ttl_seconds=None):
+        self.stored[key] = (value, ttl_seconds)
+
+
+def make_scheduler(service, quota, forecast_store=None, products_store=None):
+    return PrewarmScheduler(
+        service,
+        interval_seconds=60,
+        quota_per_cycle=quota,
+        top_forecasts=2,
+        top_locations=1,
+        history_size=100,
+        history_window_seconds=3600,
+        offpeak_hours="",
+        cache_ttl_seconds=86400,
+        forecast_store=forecast_store or FakeStore(),
+        products_store=products_store or FakeStore(),
+    )
+
+
+def forecast_params(customer_id):
+    return {
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-01",
+        "customer_id": customer_id,
+        "user_list_id": "123456789",
+        "plannable_location_id": "2840",
+        "network": "YOUTUBE",
+        "currency_code": "USD",
+    }
+
+
+def test_hour_window():
+    assert parse_hour_window("") is None
+    assert in_hour_window(3, parse_hour_window("0-6"))
+    assert not in_hour_window(9, parse_hour_window("0-6"))
+    assert in_hour_window(23, parse_hour_window("22-4"))
+    assert in_hour_window(2, parse_hour_window("22-4"))
+    assert not in_hour_window(12, parse_hour_window("22-4"))
+
+
+def test_run_once_refreshes_most_popular_within_quota():
+    service = FakeService()
+    forecast_store, products_store = FakeStore(), FakeStore()
+    scheduler = make_scheduler(service, quota=2, forecast_store=forecast_store, products_store=products_store)
+
+    for _ in range(3):
+        scheduler.record_forecast(forecast_params("111"))
+    scheduler.record_forecast(forecast_params("222"))
+    scheduler.record_location("2826")
+
+    calls = scheduler.run_once()
+    assert calls == 2
+    assert service.calls == [
+        ("products", "2840", True, 86400),
+        ("forecast", "111", True, 86400),
+    ]
+    # Written through the stale-while-revalidate stores with the pre-warming TTL
+    assert products_store.stored == {"2840": ([], 86400)}
+    assert forecast_store.stored == {
+        request_key(forecast_params("111")): ({"customer_id": "111"}, 86400)
+    }
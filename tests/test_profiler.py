@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+from app.services.profiler import ProfilerBusy, SamplingProfiler, SectionTimers
+
+
+def busy_worker(stop):
+    while not stop.is_set():
+        time.sleep(0.001)
+
+
+def test_profile_returns_collapsed_stacks():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_worker, args=(stop,), name="busy")
+    thread.start()
+    try:
+        output = SamplingProfiler().profile(0.05, 0.005)
+    finally:
+        stop.set()
+        thread.join()
+
+    lines = output.splitlines()
+    busy = [line for line in lines if line.startswith("busy;")]
+    assert busy
+    stack, count = busy[0].rsplit(" ", 1)
+    assert stack.endswith(":busy_worker")
+    assert int(count) > 0
+
+
+def test_only_one_profile_at_a_time():
+    profiler = SamplingProfiler()
+    profiler._lock.acquire()
+    with pytest.raises(ProfilerBusy):
+        profiler.profile(0.01, 0.005)
+
+
+def test_section_timers():
+    timers = SectionTimers()
+    for _ in range(2):
+        with timers.time("build_request"):
+            pass
+    with pytest.raises(ValueError), timers.time("shape_response"):
+        raise ValueError("failed")
+
+    snapshot = {entry["section"]: entry for entry in timers.snapshot()}
+    assert snapshot["build_request"]["calls"] == 2
+    assert snapshot["shape_response"]["calls"] == 1
+    assert snapshot["build_request"]["seconds"] >= 0
@@ -0,0 +1,36 @@
+import types
+
+from app.services.proto_utils import extract_fields, to_raw_proto
+
+
+def test_to_raw_proto_unwraps_proto_plus():
+    from google.ads.googleads.v22.services.types.reach_plan_service import PlannableLocation
+
+    location = PlannableLocation(id="2840", name="United States")
+    raw = to_raw_proto(location)
+
+    assert not hasattr(type(raw), "pb")
+    assert raw.id == "2840"
+    # The raw message is the one backing the wrapper, not a copy
+    raw.name = "USA"
+    assert location.name == "USA"
+
+
+def test_to_raw_proto_passes_through_plain_objects():
+    obj = types.SimpleNamespace(id=1)
+    assert to_raw_proto(obj) is obj
+
+
+def test_extract_fields_nested_paths():
+    points = [
+        types.SimpleNamespace(cost_micros=100, metrics=types.SimpleNamespace(reach=10)),
+        types.SimpleNamespace(cost_micros=200, metrics=types.SimpleNamespace(reach=15)),
+    ]
+
+    rows = extract_fields(points, {"cost_micros": "cost_micros", "reach": "metrics.reach"})
+    assert rows == [
+        {"cost_micros": 100, "reach": 10},
+        {"cost_micros": 200, "reach": 15},
+    ]
+
+    assert extract_fields(points, {"cost": "cost_micros"}) == [{"cost": 100}, {"cost": 200}]
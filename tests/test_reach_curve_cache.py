@@ -0,0 +1,57 @@
+from app.services.reach_curve_cache import ReachCurveCache, budget_split_key
+
+PARAMS = {
+    "start_date": "2025-11-01",
+    "end_date": "2025-12-01",
+    "customer_id": "1234567890",
+    "user_list_id": "123456789",
+    "plannable_location_id": "2840",
+    "network": "YOUTUBE",
+    "currency_code": "USD",
+}
+
+
+def products(trueview, non_skip):
+    return [
+        {"plannable_product_code": "TRUEVIEW_IN_STREAM", "budget_micros": trueview},
+        {"plannable_product_code": "NON_SKIP_AUCTION", "budget_micros": non_skip},
+    ]
+
+
+def point(cost, reach):
+    return {"cost_micros": cost, "reach": reach, "impressions": reach * 2, "frequency": 2.0}
+
+
+def test_budget_split_key_ignores_total_budget():
+    assert budget_split_key(products(100, 100)) == budget_split_key(products(300, 300))
+    assert budget_split_key(products(100, 100)) != budget_split_key(products(100, 300))
+
+
+def test_lookup_serves_smaller_budget_from_stored_curve():
+    cache = ReachCurveCache(ttl_seconds=60, max_entries=10)
+    cache.store(PARAMS, products(1000, 1000), [point(500, 5), point(1000, 8), point(2000, 12)])
+
+    cached = cache.lookup(PARAMS, products(500, 500))
+    assert [p["cost_micros"] for p in cached["reach_curve"]] == [500, 1000]
+    assert cached["planned_products"] == products(500, 500)
+
+    # A budget between stored points ends with a point interpolated at the budget
+    cached = cache.lookup(PARAMS, products(750, 750))
+    assert [p["cost_micros"] for p in cached["reach_curve"]] == [500, 1000, 1500]
+    assert cached["reach_curve"][-1] == {
+        "cost_micros": 1500, "reach": 10, "impressions": 20, "frequency": 2.0
+    }
+
+    # Budget beyond the covered range, different split, or different targeting misses
+    assert cache.lookup(PARAMS, products(2000, 2000)) is None
+    assert cache.lookup(PARAMS, products(500, 1500)) is None
+    assert cache.lookup({**PARAMS, "network": "YOUTUBE_AND_GOOGLE_VIDEO_PARTNERS"}, products(500, 500)) is None
+
+
+def test_store_densifies_curve():
+    cache = ReachCurveCache(ttl_seconds=60, max_entries=10)
+    cache.store(PARAMS, products(500, 500), [point(400, 4), point(1000, 8)])
+    cache.store(PARAMS, products(250, 250), [point(200, 2), point(500, 5)])
+
+    cached = cache.lookup(PARAMS, products(500, 500))
+    assert [p["cost_micros"] for p in cached["reach_curve"]] == [200, 400, 500, 1000]
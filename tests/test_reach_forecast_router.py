@@ -84,4 +84,214 @@ def test_reach_forecast_invalid_currency(client):
     }
     resp = client.get("/api/v1/reach-forecast", params=params)
     assert resp.status_code == 400
-    assert "Currency code" in resp.json()["detail"]
\ No newline at end of file
+    assert "Currency code" in resp.json()["detail"]
+
+def test_reach_forecast_planned_products(client, monkeypatch):
+    captured = {}
+
+    def fake_generate(params):
+        captured.update(params)
+        return {
+            "reach_curve": [],
+            "planned_products": params["planned_products"],
+            "currency_code": "USD",
+            "customer_id": "1234567890",
+        }
+
+    monkeypatch.setattr(
+        google_ads_client.google_ads_service,
+        "generate_reach_forecast",
+        fake_generate,
+    )
+
+    params = {
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-01",
+        "customer_id": "1234567890",
+        "user_list_id": "123456789",
+        "plannable_location_id": "2840",
+        "network": "YOUTUBE",
+        "currency_code": "USD",
+        "planned_products": ["TRUEVIEW_IN_STREAM:5000000", "NON_SKIP_AUCTION:3000000"],
+    }
+    resp = client.get("/api/v1/reach-forecast", params=params)
+    assert resp.status_code == 200
+    # Canonical order: sorted by product code
+    assert captured["planned_products"] == [
+        {"plannable_product_code": "NON_SKIP_AUCTION", "budget_micros": 3000000},
+        {"plannable_product_code": "TRUEVIEW_IN_STREAM", "budget_micros": 5000000},
+    ]
+
+    params["planned_products"] = ["TRUEVIEW_IN_STREAM"]
+    resp = client.get("/api/v1/reach-forecast", params=params)
+    assert resp.status_code == 400
+    assert "CODE:BUDGET_MICROS" in resp.json()["detail"]
+
+
+def test_aggregate_reach_forecast(client, monkeypatch):
+    def fake_generate(params):
+        return {
+            "reach_curve": [{"cost_micros": 1000, "reach": 10, "impressions": 20, "frequency": 2.0}],
+            "planned_products": [],
+            "currency_code": "USD",
+            "customer_id": params["customer_id"],
+        }
+
+    monkeypatch.setattr(
+        google_ads_client.google_ads_service,
+        "generate_reach_forecast",
+        fake_generate,
+    )
+
+    body = {
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-01",
+        "customer_id": "1234567890",
+        "user_list_id": "123456789",
+        "plannable_location_ids": ["2840", "2826"],
+        "networks": ["YOUTUBE"],
+        "currency_code": "USD",
+    }
+    resp = client.post("/api/v1/reach-forecast/aggregate", json=body)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["forecast_calls"] == 2
+    assert len(data["forecasts"]) == 2
+    assert data["aggregates"][0]["reach_curve"][-1]["reach"] == 20
+
+    body["networks"] = ["INVALID"]
+    resp = client.post("/api/v1/reach-forecast/aggregate", json=body)
+    assert resp.status_code == 400
+
+
+def test_aggregate_reach_forecast_circuit_open(client, monkeypatch):
+    from app.services.circuit_breaker import CircuitOpenError
+
+    def open_circuit(params):
+        raise CircuitOpenError("GenerateReachForecast", retry_after=12.3)
+
+    monkeypatch.setattr(google_ads_client.google_ads_service, "cached_reach_forecast", lambda params: None)
+    monkeypatch.setattr(google_ads_client.google_ads_service, "generate_reach_forecast", open_circuit)
+
+    body = {
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-01",
+        "customer_id": "1234567890",
+        "user_list_id": "123456789",
+        "plannable_location_ids": ["2840", "2826"],
+        "networks": ["YOUTUBE"],
+        "currency_code": "USD",
+    }
+    resp = client.post("/api/v1/reach-forecast/aggregate", json=body)
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "13"
+
+
+def test_optimize_budget_allocation(client, monkeypatch):
+    curves = {
+        "TRUEVIEW_IN_STREAM": [{"cost_micros": 1000, "reach": 100, "impressions": 200, "frequency": 2.0}],
+        "NON_SKIP_AUCTION": [{"cost_micros": 1000, "reach": 50, "impressions": 100, "frequency": 2.0}],
+    }
+
+    def fake_generate(params):
+        products = params["planned_products"]
+        return {
+            "reach_curve": curves[products[0]["plannable_product_code"]],
+            "planned_products": products,
+            "currency_code": "USD",
+            "customer_id": params["customer_id"],
+        }
+
+    monkeypatch.setattr(
+        google_ads_client.google_ads_service,
+        "generate_reach_forecast",
+        fake_generate,
+    )
+
+    body = {
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-01",
+        "customer_id": "1234567890",
+        "user_list_id": "123456789",
+        "plannable_location_id": "2840",
+        "network": "YOUTUBE",
+        "currency_code": "USD",
+        "budget_micros": 1000,
+    }
+    resp = client.post("/api/v1/reach-forecast/optimize", json=body)
+    assert resp.status_code == 200
+    data = resp.json()
+    # Linear curves: every increment goes to the product with more reach per micro
+    assert data["allocation"] == [{"plannable_product_code": "TRUEVIEW_IN_STREAM", "budget_micros": 1000}]
+    assert data["estimated_reach"] == 100
+    assert data["even_split_estimated_reach"] == 75
+    assert data["expected_reach"] == 100
+    assert data["forecast_calls"] == 3
+
+    body["budget_micros"] = 0
+    resp = client.post("/api/v1/reach-forecast/optimize", json=body)
+    assert resp.status_code == 400
+
+
+def test_optimize_budget_allocation_circuit_open(client, monkeypatch):
+    from app.services.circuit_breaker import CircuitOpenError
+
+    def open_circuit(params):
+        raise CircuitOpenError("GenerateReachForecast", retry_after=12.3)
+
+    monkeypatch.setattr(google_ads_client.google_ads_service, "cached_reach_forecast", lambda params: None)
+    monkeypatch.setattr(google_ads_client.google_ads_service, "generate_reach_forecast", open_circuit)
+
+    body = {
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-01",
+        "customer_id": "1234567890",
+        "user_list_id": "123456789",
+        "plannable_location_id": "2840",
+        "network": "YOUTUBE",
+        "currency_code": "USD",
+        "budget_micros": 1000,
+    }
+    resp = client.post("/api/v1/reach-forecast/optimize", json=body)
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "13"
+
+
+def test_reach_forecast_normalizes_equivalent_requests(client, monkeypatch):
+    seen = []
+
+    def fake_generate(params):
+        seen.append(params)
+        return {
+            "reach_curve": [],
+            "planned_products": [],
+            "currency_code": params["currency_code"],
+            "customer_id": params["customer_id"],
+        }
+
+    monkeypatch.setattr(
+        google_ads_client.google_ads_service,
+        "generate_reach_forecast",
+        fake_generate,
+    )
+
+    params = {
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-01",
+        "customer_id": "123-456-7890",
+        "user_list_id": "123456789",
+        "plannable_location_id": " 2840",
+        "network": "youtube",
+        "currency_code": "usd",
+    }
+    resp = client.get("/api/v1/reach-forecast", params=params)
+    assert resp.status_code == 200
+    assert resp.json()["request_parameters"]["customer_id"] == "1234567890"
+    assert seen[-1]["network"] == "YOUTUBE"
+    assert seen[-1]["currency_code"] == "USD"
+    assert seen[-1]["plannable_location_id"] == "2840"
+
+    params["end_date"] = "2025-10-01"
+    resp = client.get("/api/v1/reach-forecast", params=params)
+    assert resp.status_code == 400
+    assert "End date" in resp.json()["detail"]
@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+from app.services.cache import CacheEntry
+from app.services.stale_while_revalidate import StaleWhileRevalidate, stale_headers
+
+
+def age_entry(swr, key, seconds):
+    entry = swr._cache.get_entry(key)
+    swr._cache._entries[key] = CacheEntry(entry.value, entry.stored_at - seconds)
+
+
+def test_fresh_result_served_without_fetch():
+    swr = StaleWhileRevalidate(
+        "test", fresh_seconds=60, revalidate_seconds=300, max_stale_seconds=600, max_entries=10
+    )
+    assert swr.get("k", lambda: "v1") == ("v1", None)
+    assert swr.get("k", lambda: "v2") == ("v1", None)
+
+
+def test_stale_result_served_and_refreshed_in_background():
+    swr = StaleWhileRevalidate(
+        "test", fresh_seconds=60, revalidate_seconds=300, max_stale_seconds=600, max_entries=10
+    )
+    swr.get("k", lambda: "v1")
+    age_entry(swr, "k", 120)
+
+    value, stale_age = swr.get("k", lambda: "v2")
+    assert value == "v1"
+    assert stale_age >= 120
+
+    deadline = time.time() + 2
+    while swr._cache.get("k") != "v2" and time.time() < deadline:
+        time.sleep(0.01)
+    assert swr.get("k", lambda: "v3") == ("v2", None)
+
+
+def test_stale_result_served_on_failure_within_max_stale():
+    swr = StaleWhileRevalidate(
+        "test", fresh_seconds=60, revalidate_seconds=300, max_stale_seconds=600, max_entries=10
+    )
+    swr.get("k", lambda: "v1")
+
+    def failing_fetch():
+        raise Exception("upstream unavailable")
+
+    # Too old to revalidate in the background but still within max-stale
+    age_entry(swr, "k", 400)
+    value, stale_age = swr.get("k", failing_fetch)
+    assert value == "v1"
+    assert stale_headers(stale_age)["X-Cache-Status"] == "STALE"
+
+    age_entry(swr, "k", 300)
+    with pytest.raises(Exception, match="upstream unavailable"):
+        swr.get("k", failing_fetch)
+
+
+def test_disabled_always_fetches():
+    swr = StaleWhileRevalidate("test", 60, 300, 600, 10, enabled=False)
+    swr.get("k", lambda: "v1")
+    assert swr.get("k", lambda: "v2") == ("v2", None)
+
+
+def test_background_refreshes_are_admitted_and_bounded():
+    from contextlib import contextmanager
+    import threading
+
+    swr = StaleWhileRevalidate(
+        "test", fresh_seconds=60, revalidate_seconds=300, max_stale_seconds=600, max_entries=10,
+        refresh_workers=2,
+    )
+    keys = [f"k{i}" for i in range(6)]
+    for key in keys:
+        swr.get(key, lambda: "v1")
+        age_entry(swr, key, 120)
+
+    lock = threading.Lock()
+    state = {"admitted": 0, "running": 0, "peak": 0}
+
+    @contextmanager
+    def admit():
+        with lock:
+            state["admitted"] += 1
+        yield
+
+    def refresh():
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+        return "v2"
+
+    for key in keys:
+        assert swr.lookup(key, refresh, admit=admit)[0] == "v1"
+
+    deadline = time.time() + 2
+    while any(swr._cache.get(key) != "v2" for key in keys) and time.time() < deadline:
+        time.sleep(0.01)
+    assert all(swr._cache.get(key) == "v2" for key in keys)
+    assert state["admitted"] == 6
+    assert state["peak"] <= 2
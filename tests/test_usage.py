@@ -0,0 +1,60 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from app.services.usage import (
+    UsageBudgetExceeded,
+    UsageTracker,
+    current_caller,
+    seconds_until_next_day,
+    usage_day,
+)
+
+
+def make_tracker(tmp_path, budget=0):
+    return UsageTracker(str(tmp_path / "usage.sqlite3"), budget, retention_days=30, flush_interval_seconds=60)
+
+
+def record_as(tracker, caller, customer_id, **counts):
+    token = current_caller.set(caller)
+    try:
+        tracker.record(customer_id, **counts)
+    finally:
+        current_caller.reset(token)
+
+
+def test_usage_combines_flushed_and_pending_counts(tmp_path):
+    tracker = make_tracker(tmp_path)
+    record_as(tracker, "team-a", "111", upstream_calls=2, upstream_seconds=0.5)
+    record_as(tracker, "team-b", "222", cache_hits=1)
+    tracker.flush()
+    record_as(tracker, "team-a", "111", upstream_calls=1, retries=1)
+
+    # A second worker sharing the store
+    other = make_tracker(tmp_path)
+    record_as(other, "team-a", "111", upstream_calls=4)
+    other.flush()
+
+    usage = tracker.usage(usage_day())
+    assert [(entry["caller"], entry["upstream_calls"]) for entry in usage] == [("team-a", 7), ("team-b", 0)]
+    assert usage[0]["retries"] == 1
+    assert usage[0]["upstream_seconds"] == pytest.approx(0.5)
+    assert tracker.usage(usage_day(), customer_id="222")[0]["cache_hits"] == 1
+    assert tracker.usage("2000-01-01") == []
+
+
+def test_daily_budget_per_caller(tmp_path):
+    tracker = make_tracker(tmp_path, budget=3)
+    record_as(tracker, "team-a", "111", upstream_calls=2)
+    tracker.check_budget("team-a")
+    tracker.flush()
+    record_as(tracker, "team-a", "222", upstream_calls=1)
+
+    with pytest.raises(UsageBudgetExceeded) as excinfo:
+        tracker.check_budget("team-a")
+    assert 0 < excinfo.value.retry_after <= 86400
+    tracker.check_budget("team-b")
+
+
+def test_seconds_until_next_day():
+    assert seconds_until_next_day(datetime(2025, 11, 1, 23, 59, 30, tzinfo=UTC)) == 30